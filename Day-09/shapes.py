@@ -0,0 +1,163 @@
+"""
+shapes.py — Shape interface and a streaming Polygon
+
+Shape is the same interface used in main.py (name, area(), perimeter()).
+Polygon computes shoelace area, perimeter and centroid in ONE pass over
+its vertices, keeping only a handful of running totals, so it works for
+polygons with tens of millions of vertices:
+
+    Polygon([(0, 0), (4, 0), (4, 3)])                  # any iterable of (x, y)
+    Polygon.from_file("coast.f64")                     # memory-mapped float64 x,y pairs
+"""
+
+import math
+import mmap
+
+
+class Shape:
+    """Base class for shapes."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def area(self):
+        """Calculate area - to be overridden."""
+        raise NotImplementedError("Subclass must implement area()")
+
+    def perimeter(self):
+        """Calculate perimeter - to be overridden."""
+        raise NotImplementedError("Subclass must implement perimeter()")
+
+
+class Polygon(Shape):
+    """A simple polygon measured from a stream of (x, y) vertices.
+
+    The vertex source is read once, on the first call to area(),
+    perimeter() or centroid(); all three results are computed in that
+    pass and cached. The polygon is closed implicitly (last -> first).
+    """
+
+    def __init__(self, vertices):
+        super().__init__("Polygon")
+        self._vertices = vertices
+        self._stats = None
+
+    @classmethod
+    def from_file(cls, path):
+        """Polygon whose vertices are float64 x,y pairs in a binary file."""
+        return cls(_MappedVertices(path))
+
+    def area(self):
+        return abs(self._measure()[0])
+
+    def signed_area(self):
+        """Shoelace area; positive for counter-clockwise vertex order."""
+        return self._measure()[0]
+
+    def perimeter(self):
+        return self._measure()[1]
+
+    def centroid(self):
+        """Area centroid (x, y); NaN coordinates for a zero-area polygon."""
+        return self._measure()[2]
+
+    def vertex_count(self):
+        return self._measure()[3]
+
+    def _measure(self):
+        if self._stats is None:
+            self._stats = _measure(iter(self._vertices))
+        return self._stats
+
+
+def _measure(points):
+    """Single pass over points: (signed area, perimeter, centroid, count)."""
+    try:
+        x0, y0 = next(points)
+    except StopIteration:
+        return 0.0, 0.0, (math.nan, math.nan), 0
+
+    # Work relative to the first vertex: the cross products stay small
+    # even for coordinates far from the origin (e.g. projected metres).
+    hypot = math.hypot
+    cross_sum = cx_sum = cy_sum = perimeter = 0.0
+    px = py = 0.0
+    count = 1
+    for x, y in points:
+        x -= x0
+        y -= y0
+        cross = px * y - x * py
+        cross_sum += cross
+        cx_sum += (px + x) * cross
+        cy_sum += (py + y) * cross
+        perimeter += hypot(x - px, y - py)
+        px, py = x, y
+        count += 1
+
+    # Closing edge back to the first vertex (0, 0) adds no cross term
+    perimeter += hypot(px, py)
+
+    area = cross_sum / 2
+    if area == 0:
+        centroid = (math.nan, math.nan)
+    else:
+        centroid = (x0 + cx_sum / (6 * area), y0 + cy_sum / (6 * area))
+    return area, perimeter, centroid, count
+
+
+class _MappedVertices:
+    """Iterate float64 (x, y) pairs from a memory-mapped file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size == 0:
+                return
+            if size % 16:
+                raise ValueError(f"{self.path}: size {size} is not a whole number of "
+                                 f"float64 (x, y) pairs (16 bytes each)")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                coords = memoryview(mm).cast('d')
+                try:
+                    yield from zip(coords[0::2], coords[1::2])
+                finally:
+                    coords.release()
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from array import array
+
+    square = Polygon([(0, 0), (4, 0), (4, 4), (0, 4)])
+    print(f"{square.name}:")
+    print(f"  Area: {square.area():.2f}")
+    print(f"  Perimeter: {square.perimeter():.2f}")
+    print(f"  Centroid: {square.centroid()}")
+
+    N = 2_000_000
+    step = 2 * math.pi / N
+    coords = array('d')
+    for i in range(N):
+        coords.append(1000.0 * math.cos(i * step))
+        coords.append(1000.0 * math.sin(i * step))
+
+    fd, path = tempfile.mkstemp(suffix=".f64")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            coords.tofile(f)
+        start = time.perf_counter()
+        circle = Polygon.from_file(path)
+        area = circle.area()
+        elapsed = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    print(f"\n{N:,}-vertex circle from a memory-mapped file:")
+    print(f"  Area: {area:.4f} (pi * r^2 = {math.pi * 1000.0 ** 2:.4f})")
+    print(f"  Throughput: {N / elapsed / 1e6:.2f} M vertices/s")
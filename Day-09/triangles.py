@@ -0,0 +1,116 @@
+"""
+triangles.py — Numerically stable, batched triangle areas
+
+The Triangle class in main.py uses the textbook Heron formula
+    s = (a + b + c) / 2;  area = sqrt(s(s-a)(s-b)(s-c))
+which loses most of its digits for needle-shaped triangles, because
+s - a subtracts two nearly equal numbers.
+
+Here we use the stable variant (sides sorted so that a >= b >= c):
+    area = 1/4 * sqrt((a+(b+c)) * (c-(a-b)) * (c+(a-b)) * (a+(b-c)))
+The brackets matter — they must not be rearranged.
+
+Batches are computed with NumPy when it is installed, otherwise with a
+plain-Python loop over array('d') buffers. Invalid triangles (negative
+sides or a broken triangle inequality) give NaN instead of raising.
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:          # NumPy is optional
+    np = None
+
+
+def triangle_area(a, b, c):
+    """Area of one triangle from its side lengths (NaN if invalid)."""
+    # Sort so that a >= b >= c
+    if a < b:
+        a, b = b, a
+    if b < c:
+        b, c = c, b
+    if a < b:
+        a, b = b, a
+    if c < 0 or c - (a - b) < 0:
+        return math.nan
+    return 0.25 * math.sqrt((a + (b + c)) * (c - (a - b)) * (c + (a - b)) * (a + (b - c)))
+
+
+def triangle_areas(a, b, c):
+    """Areas of many triangles from three side-length sequences.
+
+    Returns a NumPy array when NumPy is available, otherwise array('d').
+    """
+    if np is not None:
+        return _areas_numpy(a, b, c)
+    if not len(a) == len(b) == len(c):
+        raise ValueError("side sequences must have the same length")
+    return array('d', map(triangle_area, a, b, c))
+
+
+def _areas_numpy(a, b, c):
+    sides = np.stack([np.asarray(a, dtype=float),
+                      np.asarray(b, dtype=float),
+                      np.asarray(c, dtype=float)])
+    sides = -np.sort(-sides, axis=0)        # descending: a >= b >= c
+    a, b, c = sides
+    with np.errstate(invalid='ignore'):
+        product = (a + (b + c)) * (c - (a - b)) * (c + (a - b)) * (a + (b - c))
+        invalid = (c < 0) | (c - (a - b) < 0)
+        areas = 0.25 * np.sqrt(np.where(invalid, np.nan, product))
+    return areas
+
+
+def triangle_areas_from_vertices(x0, y0, x1, y1, x2, y2):
+    """Areas of many triangles from vertex-coordinate sequences.
+
+    With coordinates available the cross product is both cheaper and more
+    accurate than going through side lengths, so Heron is not used here:
+        area = |(x1-x0)(y2-y0) - (x2-x0)(y1-y0)| / 2
+    """
+    if np is not None:
+        x0, y0, x1, y1, x2, y2 = (np.asarray(v, dtype=float) for v in (x0, y0, x1, y1, x2, y2))
+        return 0.5 * np.abs((x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0))
+    if not len(x0) == len(y0) == len(x1) == len(y1) == len(x2) == len(y2):
+        raise ValueError("coordinate sequences must have the same length")
+    return array('d', [
+        0.5 * abs((bx - ax) * (cy - ay) - (cx - ax) * (by - ay))
+        for ax, ay, bx, by, cx, cy in zip(x0, y0, x1, y1, x2, y2)
+    ])
+
+
+def degenerate_indices(areas, tolerance=0.0):
+    """Indices of invalid (NaN) or flat (area <= tolerance) triangles."""
+    if np is not None and isinstance(areas, np.ndarray):
+        return np.flatnonzero(np.isnan(areas) | (areas <= tolerance)).tolist()
+    return [i for i, area in enumerate(areas) if not area > tolerance]
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import random
+    import time
+
+    def naive_heron(a, b, c):
+        s = (a + b + c) / 2
+        return math.sqrt(s * (s - a) * (s - b) * (s - c))
+
+    print("Needle triangle a=b=1e6, c=1e-3 (true area ~ 500.0):")
+    print(f"  naive Heron  : {naive_heron(1e6, 1e6, 1e-3)!r}")
+    print(f"  stable Heron : {triangle_area(1e6, 1e6, 1e-3)!r}")
+
+    print("\nInvalid / flat triangles:")
+    areas = triangle_areas([1, 3, 2, -1], [1, 4, 1, 1], [5, 5, 1, 1])
+    print(f"  areas      : {list(areas)}")
+    print(f"  degenerate : {degenerate_indices(areas)}")
+
+    N = 1_000_000
+    rng = random.Random(42)
+    xs = [[rng.random() for _ in range(N)] for _ in range(6)]
+    backend = "numpy" if np is not None else "pure Python"
+    start = time.perf_counter()
+    areas = triangle_areas_from_vertices(*xs)
+    elapsed = time.perf_counter() - start
+    print(f"\n{N:,} triangles from vertices ({backend}): {elapsed:.3f}s")
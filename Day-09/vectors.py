@@ -0,0 +1,238 @@
+"""
+vectors.py — Compact 2D vectors for large simulations
+
+Vector      : like the Vector in main.py, but with __slots__ (no per-instance
+              __dict__) and in-place operators that reuse the same object.
+VectorArray : many vectors stored in two contiguous double buffers
+              (array('d')), with the same operators applied element-wise.
+"""
+
+from array import array
+
+
+class Vector:
+    """A 2D vector without a per-instance __dict__."""
+
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __str__(self):
+        return f"Vector({self.x}, {self.y})"
+
+    def __repr__(self):
+        return f"Vector({self.x!r}, {self.y!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Vector):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    # --- Operators that return a new Vector ---
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, scalar):
+        return Vector(self.x * scalar, self.y * scalar)
+
+    __rmul__ = __mul__
+
+    # --- In-place operators (no new object is allocated) ---
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __getitem__(self, index):
+        if index == 0:
+            return self.x
+        elif index == 1:
+            return self.y
+        raise IndexError("Vector index out of range")
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+
+class VectorArray:
+    """A fixed-length collection of 2D vectors in two double buffers."""
+
+    __slots__ = ('xs', 'ys')
+
+    def __init__(self, xs=(), ys=()):
+        self.xs = xs if isinstance(xs, array) and xs.typecode == 'd' else array('d', xs)
+        self.ys = ys if isinstance(ys, array) and ys.typecode == 'd' else array('d', ys)
+        if len(self.xs) != len(self.ys):
+            raise ValueError("xs and ys must have the same length")
+
+    @classmethod
+    def zeros(cls, n):
+        """Create n zero vectors."""
+        return cls(array('d', bytes(8 * n)), array('d', bytes(8 * n)))
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Build an array from an iterable of Vector (or (x, y)) objects."""
+        xs = array('d')
+        ys = array('d')
+        for x, y in vectors:
+            xs.append(x)
+            ys.append(y)
+        return cls(xs, ys)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        return Vector(self.xs[index], self.ys[index])
+
+    def __setitem__(self, index, vector):
+        self.xs[index], self.ys[index] = vector
+
+    def __iter__(self):
+        for x, y in zip(self.xs, self.ys):
+            yield Vector(x, y)
+
+    def __repr__(self):
+        return f"VectorArray(n={len(self)})"
+
+    def copy(self):
+        """Return an independent copy of the buffers."""
+        return VectorArray(array('d', self.xs), array('d', self.ys))
+
+    def _check(self, other):
+        if len(other) != len(self):
+            raise ValueError("VectorArray lengths differ")
+
+    # --- Operators that return a new VectorArray ---
+    def __add__(self, other):
+        result = self.copy()
+        result += other
+        return result
+
+    def __sub__(self, other):
+        result = self.copy()
+        result -= other
+        return result
+
+    def __mul__(self, scalar):
+        result = self.copy()
+        result *= scalar
+        return result
+
+    __rmul__ = __mul__
+
+    # --- In-place, element-wise operators ---
+    # Results are written back into the existing buffers with slice
+    # assignment: arrays passed to __init__ see the update, and the only
+    # temporary is one packed array per buffer (no list of float objects)
+    def __iadd__(self, other):
+        if isinstance(other, Vector):
+            self.xs[:] = array('d', map(float(other.x).__add__, self.xs))
+            self.ys[:] = array('d', map(float(other.y).__add__, self.ys))
+            return self
+        self._check(other)
+        self.xs[:] = array('d', map(float.__add__, self.xs, other.xs))
+        self.ys[:] = array('d', map(float.__add__, self.ys, other.ys))
+        return self
+
+    def __isub__(self, other):
+        if isinstance(other, Vector):
+            self.xs[:] = array('d', map(float(-other.x).__add__, self.xs))
+            self.ys[:] = array('d', map(float(-other.y).__add__, self.ys))
+            return self
+        self._check(other)
+        self.xs[:] = array('d', map(float.__sub__, self.xs, other.xs))
+        self.ys[:] = array('d', map(float.__sub__, self.ys, other.ys))
+        return self
+
+    def __imul__(self, scalar):
+        scale = float(scalar).__mul__
+        self.xs[:] = array('d', map(scale, self.xs))
+        self.ys[:] = array('d', map(scale, self.ys))
+        return self
+
+    def axpy(self, scale, other):
+        """In-place self += scale * other, without a temporary VectorArray."""
+        self._check(other)
+        scale = float(scale).__mul__
+        self.xs[:] = array('d', map(float.__add__, self.xs, map(scale, other.xs)))
+        self.ys[:] = array('d', map(float.__add__, self.ys, map(scale, other.ys)))
+        return self
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    class DictVector:
+        """The original dict-backed Vector from main.py."""
+
+        def __init__(self, x, y):
+            self.x = x
+            self.y = y
+
+        def __add__(self, other):
+            return DictVector(self.x + other.x, self.y + other.y)
+
+        def __mul__(self, scalar):
+            return DictVector(self.x * scalar, self.y * scalar)
+
+    N = 200_000
+    DT = 0.01
+
+    def step_dict():
+        pos = [DictVector(float(i), 0.0) for i in range(N)]
+        vel = [DictVector(1.0, 2.0) for _ in range(N)]
+        for i in range(N):
+            pos[i] = pos[i] + vel[i] * DT
+        return pos
+
+    def step_slots():
+        pos = [Vector(float(i), 0.0) for i in range(N)]
+        vel = [Vector(1.0, 2.0) for _ in range(N)]
+        for p, v in zip(pos, vel):
+            p += v * DT
+        return pos
+
+    def step_array():
+        pos = VectorArray(array('d', map(float, range(N))), array('d', bytes(8 * N)))
+        vel = VectorArray(array('d', [1.0]) * N, array('d', [2.0]) * N)
+        pos += vel * DT
+        return pos
+
+    print(f"Physics step over {N:,} vectors")
+    print(f"  {'variant':<12} {'time (s)':>10} {'peak alloc':>12} {'live blocks':>12}")
+    for name, fn in [("dict", step_dict), ("slots", step_slots), ("VectorArray", step_array)]:
+        # Wall time without tracing overhead
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+
+        # Allocations: peak traced bytes and blocks still held by the result
+        before = sys.getallocatedblocks()
+        tracemalloc.start()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks = sys.getallocatedblocks() - before
+        del result
+        print(f"  {name:<12} {elapsed:>10.3f} {peak / 1024 / 1024:>10.1f}MB {blocks:>12,}")
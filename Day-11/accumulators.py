@@ -0,0 +1,128 @@
+"""
+accumulators.py — Accurate, mergeable running sums
+
+A plain float total (Calculator.add, or sum() over a generator) rounds
+after every addition, so error grows with the number of terms. SumAccumulator
+keeps a second float holding the rounding error (Neumaier's improvement
+of Kahan summation) and folds whole chunks in with math.fsum, which is
+exactly rounded.
+
+Partial accumulators built by separate workers can be merged:
+
+    >>> parts = [SumAccumulator(chunk) for chunk in ([0.1] * 5, [0.1] * 5)]
+    >>> SumAccumulator.merged(parts).value
+    1.0
+"""
+
+import math
+import random
+from itertools import islice
+
+__all__ = ['SumAccumulator']
+
+
+class SumAccumulator:
+    """Compensated (Neumaier) running sum that can be merged."""
+
+    __slots__ = ('total', 'compensation', 'count')
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, values=()):
+        self.total = 0.0
+        self.compensation = 0.0
+        self.count = 0
+        self.extend(values)
+
+    def add(self, value):
+        """Add a single value."""
+        total = self.total
+        new_total = total + value
+        # With an inf/nan total the correction would be inf - inf = nan;
+        # like math.fsum, the result is then just the non-finite total
+        if math.isfinite(new_total):
+            if abs(total) >= abs(value):
+                self.compensation += (total - new_total) + value
+            else:
+                self.compensation += (value - new_total) + total
+        self.total = new_total
+        self.count += 1
+        return self
+
+    __iadd__ = add
+
+    def extend(self, values):
+        """Add many values, CHUNK_SIZE at a time via math.fsum."""
+        iterator = iter(values)
+        while True:
+            chunk = list(islice(iterator, self.CHUNK_SIZE))
+            if not chunk:
+                return self
+            try:
+                chunk_sum = math.fsum(chunk)
+            except (ValueError, OverflowError):     # inf - inf, or overflow inside fsum
+                for value in chunk:
+                    self.add(value)
+                continue
+            self.add(chunk_sum)
+            self.count += len(chunk) - 1
+
+    def merge(self, other):
+        """Fold another accumulator (e.g. from a worker) into this one."""
+        count = self.count
+        self.add(other.total)
+        self.add(other.compensation)
+        self.count = count + other.count
+        return self
+
+    @classmethod
+    def merged(cls, accumulators):
+        """Combine several partial accumulators into a new one."""
+        result = cls()
+        for accumulator in accumulators:
+            result.merge(accumulator)
+        return result
+
+    @property
+    def value(self):
+        """The compensated sum."""
+        return self.total + self.compensation
+
+    def __float__(self):
+        return self.value
+
+    def __getstate__(self):
+        return self.total, self.compensation, self.count
+
+    def __setstate__(self, state):
+        self.total, self.compensation, self.count = state
+
+    def __repr__(self):
+        return f"SumAccumulator(value={self.value!r}, count={self.count})"
+
+
+def _random_prices(seed, n=1_000_000):
+    rng = random.Random(seed)
+    return (round(rng.uniform(0.01, 999.99), 2) for _ in range(n))
+
+
+def _sum_prices(seed):
+    # Module level, not in the __main__ block, so spawn/forkserver workers can import it
+    return SumAccumulator(_random_prices(seed))
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    seeds = range(4)
+    exact = math.fsum(p for seed in seeds for p in _random_prices(seed))
+    naive = sum(p for seed in seeds for p in _random_prices(seed))
+
+    with ProcessPoolExecutor() as pool:
+        total = SumAccumulator.merged(pool.map(_sum_prices, seeds))
+
+    print(f"Summing {total.count:,} prices:")
+    print(f"  math.fsum (exact)     : {exact!r}")
+    print(f"  sum() error           : {naive - exact:+.3e}")
+    print(f"  SumAccumulator error  : {total.value - exact:+.3e}")
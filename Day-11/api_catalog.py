@@ -0,0 +1,148 @@
+"""
+api_catalog.py — Cached catalog of a module's public API
+
+main.py lists functions with inspect.getmembers(), which walks and
+classifies every attribute of the module on each call. ApiCatalog does
+that work once per module and keeps, for each public name, the object,
+its signature and its docstring in a dict:
+
+    catalog = ApiCatalog()
+    entry = catalog.get(limited_module, 'greet')      # O(1) after the first call
+    entry.signature                                   # '(name)'
+    catalog.names(mypackage)                          # respects __all__
+
+Public names are those in __all__ when the module defines it, otherwise
+every name without a leading underscore that the module itself defines.
+A module's entries are rebuilt automatically after importlib.reload().
+"""
+
+import importlib
+import inspect
+import sys
+import threading
+from dataclasses import dataclass
+
+__all__ = ['ApiCatalog', 'ApiEntry', 'catalog']
+
+
+@dataclass(frozen=True)
+class ApiEntry:
+    """One public name of a module."""
+    name: str
+    module: str
+    obj: object
+    kind: str               # 'function', 'class', 'module' or 'data'
+    signature: str = None   # None when not callable or not introspectable
+    doc: str = None
+
+    def __call__(self, *args, **kwargs):
+        return self.obj(*args, **kwargs)
+
+
+def _kind(obj):
+    if inspect.isclass(obj):
+        return 'class'
+    if inspect.ismodule(obj):
+        return 'module'
+    if callable(obj):
+        return 'function'
+    return 'data'
+
+
+def _public_names(module):
+    names = getattr(module, '__all__', None)
+    if names is not None:
+        return list(names)
+    result = []
+    for name, obj in vars(module).items():
+        if name.startswith('_') or inspect.ismodule(obj):
+            continue
+        # Skip names that were only imported into the module
+        if getattr(obj, '__module__', module.__name__) != module.__name__:
+            continue
+        result.append(name)
+    return result
+
+
+def _entry(module, name):
+    obj = getattr(module, name)
+    kind = _kind(obj)
+    signature = None
+    if kind in ('function', 'class'):
+        try:
+            signature = str(inspect.signature(obj))
+        except (TypeError, ValueError):
+            pass
+    doc = inspect.getdoc(obj) if kind != 'data' else None
+    return ApiEntry(name, module.__name__, obj, kind, signature, doc)
+
+
+class ApiCatalog:
+    """Introspect each module once; answer lookups from a dict."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modules = {}      # module name -> (module __spec__, {name: ApiEntry})
+
+    def _module(self, module):
+        if isinstance(module, str):
+            module = sys.modules.get(module) or importlib.import_module(module)
+        return module
+
+    def entries(self, module):
+        """All public entries of a module as a {name: ApiEntry} dict."""
+        module = self._module(module)
+        cached = self._modules.get(module.__name__)
+        # importlib.reload() gives the module a new __spec__ object
+        if cached is not None and cached[0] is module.__spec__:
+            return cached[1]
+        with self._lock:
+            entries = {name: _entry(module, name) for name in _public_names(module)}
+            self._modules[module.__name__] = (module.__spec__, entries)
+        return entries
+
+    def get(self, module, name):
+        """The ApiEntry for module.name (KeyError if it is not public)."""
+        return self.entries(module)[name]
+
+    def names(self, module, kind=None):
+        """Public names, optionally only those of one kind ('function', ...)."""
+        entries = self.entries(module)
+        if kind is None:
+            return list(entries)
+        return [name for name, entry in entries.items() if entry.kind == kind]
+
+    def invalidate(self, module=None):
+        """Drop cached entries for one module, or for all modules."""
+        with self._lock:
+            if module is None:
+                self._modules.clear()
+            else:
+                name = module if isinstance(module, str) else module.__name__
+                self._modules.pop(name, None)
+
+
+# Shared default catalog
+catalog = ApiCatalog()
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import timeit
+
+    import limited_module
+    import math_utils
+
+    print(f"limited_module: {catalog.names(limited_module)}")
+    print(f"math_utils functions: {catalog.names(math_utils, 'function')}")
+    print(f"greet{catalog.get('limited_module', 'greet').signature}")
+
+    n = 10_000
+    slow = timeit.timeit(
+        lambda: [name for name, obj in inspect.getmembers(math_utils) if inspect.isfunction(obj)],
+        number=n)
+    fast = timeit.timeit(lambda: catalog.names(math_utils, 'function'), number=n)
+    lookup = timeit.timeit(lambda: catalog.get(math_utils, 'add'), number=n)
+    print(f"\ninspect.getmembers : {slow / n * 1e6:8.2f} us per call")
+    print(f"catalog.names      : {fast / n * 1e6:8.2f} us per call")
+    print(f"catalog.get        : {lookup / n * 1e6:8.2f} us per call")
@@ -0,0 +1,181 @@
+"""
+async_files.py — asyncio versions of the file helpers
+
+utils.save_json(), utils.load_json() and Day-10's safe_read() block the
+event loop while they read, write and parse. These coroutines do the
+same work away from the loop:
+
+    data = await load_json("big.json")
+    await save_json(data, "copy.json")
+    text = await safe_read("notes.txt")                 # None on error, like Day-10
+    configs = await load_many(paths, limit=32)          # at most 32 files at once
+
+File I/O runs on a dedicated, bounded thread pool (IO_WORKERS threads),
+so these helpers cannot exhaust the loop's default executor. JSON files
+of PROCESS_THRESHOLD bytes or more are read and parsed in a process
+pool instead: json.loads() is one C call that holds the GIL throughout,
+so in a thread it still stalls the loop for the whole parse. Only
+unpickling the result happens in this process, which is cheaper.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import utils
+
+__all__ = ['save_json', 'load_json', 'safe_read', 'load_many', 'shutdown',
+           'IO_WORKERS', 'PROCESS_THRESHOLD']
+
+IO_WORKERS = 8
+PROCESS_THRESHOLD = 1 << 20             # bytes
+
+_io_pool = None
+_process_pool = None
+_pools_lock = threading.Lock()
+
+
+def _io():
+    global _io_pool
+    with _pools_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='async-files')
+        return _io_pool
+
+
+def _processes():
+    global _process_pool
+    with _pools_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor()
+        return _process_pool
+
+
+def shutdown(wait=True):
+    """Stop the worker pools (they are recreated on next use)."""
+    global _io_pool, _process_pool
+    with _pools_lock:
+        pools, _io_pool, _process_pool = (_io_pool, _process_pool), None, None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+async def _run(pool, func, *args):
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
+async def save_json(data, filepath):
+    """Save data as JSON (utils.save_json without blocking the loop)."""
+    await _run(_io(), utils.save_json, data, filepath)
+
+
+async def load_json(filepath, threshold=None):
+    """Load JSON data; files of threshold bytes or more are parsed in a worker process."""
+    threshold = PROCESS_THRESHOLD if threshold is None else threshold
+    size = await _run(_io(), os.path.getsize, filepath)
+    if size >= threshold:
+        # The worker opens the file itself: only the path and the parsed
+        # result cross the process boundary, not the raw text
+        return await _run(_processes(), utils.load_json, filepath)
+    return await _run(_io(), utils.load_json, filepath)
+
+
+def _safe_read(filepath):
+    """Day-10's safe_read(): the file's text, or None with a message on error."""
+    try:
+        with open(filepath, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"  ERROR: '{filepath}' not found")
+    except PermissionError:
+        print(f"  ERROR: No permission to read '{filepath}'")
+    except IsADirectoryError:
+        print(f"  ERROR: '{filepath}' is a directory, not a file")
+    except OSError as e:
+        print(f"  OS ERROR: {e}")
+    return None
+
+
+async def safe_read(filepath):
+    """Safely read a file, returning None on any error."""
+    return await _run(_io(), _safe_read, filepath)
+
+
+async def load_many(paths, limit=16, loader=None, return_exceptions=False):
+    """Load many files concurrently, at most limit at a time; results in input order.
+
+    loader defaults to load_json. With return_exceptions=True a failing
+    file gives its exception in the result list instead of cancelling
+    the rest of the batch.
+    """
+    loader = loader or load_json
+    semaphore = asyncio.Semaphore(limit)
+
+    async def load(path):
+        async with semaphore:
+            return await loader(path)
+
+    return await asyncio.gather(*(load(path) for path in paths), return_exceptions=return_exceptions)
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    async def lag_during(label, work):
+        """Run work() while a ticker measures how late the event loop wakes it."""
+        worst = 0.0
+        done = False
+
+        async def ticker():
+            nonlocal worst
+            while not done:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                worst = max(worst, time.perf_counter() - start - 0.001)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)          # let the ticker start before blocking work can run
+        start = time.perf_counter()
+        await work()
+        elapsed = time.perf_counter() - start
+        done = True
+        await task
+        print(f"{label:<32} {elapsed:6.2f}s, worst event-loop lag {worst * 1000:7.1f} ms")
+
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            small = [os.path.join(tmp, f"small-{i}.json") for i in range(200)]
+            await asyncio.gather(*(save_json({'id': i, 'tags': ['a', 'b']}, path)
+                                   for i, path in enumerate(small)))
+            big = os.path.join(tmp, 'big.json')
+            utils.save_json([{'id': i, 'name': f"user {i}", 'score': i / 3} for i in range(300_000)], big)
+            print(f"big.json: {utils.format_size(os.path.getsize(big))}")
+
+            async def blocking():
+                for path in small:
+                    utils.load_json(path)
+                utils.load_json(big)
+
+            async def threaded_only():
+                await load_many(small, limit=32)
+                await load_json(big, threshold=sys.maxsize)
+
+            async def with_processes():
+                await load_many(small, limit=32)
+                await load_json(big)
+
+            await lag_during("utils.load_json (blocking)", blocking)
+            await lag_during("load_many + load_json in thread", threaded_only)
+            await lag_during("load_many + load_json in process", with_processes)
+
+            print(f"safe_read of a missing file -> {await safe_read(os.path.join(tmp, 'missing.txt'))}")
+            results = await load_many([small[0], os.path.join(tmp, 'missing.json')], return_exceptions=True)
+            print(f"load_many with a missing file -> {results}")
+        shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,494 @@
+"""
+binpack.py — Compact binary serialization (a MessagePack dialect)
+
+A faster, smaller alternative to utils.save_json()/load_json() for
+caches and other files that only programs read:
+
+    save_binary(data, "cache.bin")
+    data = load_binary("cache.bin")
+
+    blob = packb({'when': datetime.now(), 'raw': b'\\x00\\x01'})
+    unpackb(blob)
+
+Values are self-describing: every value starts with a type byte, and
+small integers, short strings and small containers fit their length
+in that byte too. The wire format is MessagePack, so other MessagePack
+readers can decode it. Supported types are those of JSON (None, bool,
+int, float, str, list/tuple, dict) plus bytes and datetime:
+
+    bytes / bytearray / memoryview   MessagePack bin
+    datetime                         ext type 1: int64 microseconds since
+                                     the epoch + int32 UTC offset in seconds
+    int outside 64 bits              ext type 2: signed big-endian bytes
+
+Aware datetimes come back with a fixed-offset timezone (the zone name,
+e.g. of a zoneinfo object, is not stored).
+
+The pure-Python codec beats utils.save_json() (indent=2) but not the C
+json parser; installing the optional msgpack package makes packb() and
+unpackb() use its C extension instead.
+"""
+
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+
+# The wire format is plain MessagePack, so when the msgpack package is
+# installed its C extension does the work, with identical output
+try:
+    import msgpack as _msgpack
+except ImportError:          # msgpack is optional
+    _msgpack = None
+
+__all__ = ['packb', 'unpackb', 'save_binary', 'load_binary', 'BinpackError']
+
+EXT_DATETIME = 1
+EXT_BIGINT = 2
+
+_NAIVE = 0x7FFFFFFF                     # offset value marking a naive datetime
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_pack_u8 = struct.Struct('>B').pack
+_pack_u16 = struct.Struct('>BH').pack
+_pack_u32 = struct.Struct('>BI').pack
+_pack_u64 = struct.Struct('>BQ').pack
+_pack_i8 = struct.Struct('>Bb').pack
+_pack_i16 = struct.Struct('>Bh').pack
+_pack_i32 = struct.Struct('>Bi').pack
+_pack_i64 = struct.Struct('>Bq').pack
+_pack_f64 = struct.Struct('>Bd').pack
+_pack_datetime = struct.Struct('>qi').pack
+
+_unpack_u8 = struct.Struct('>B').unpack_from
+_unpack_u16 = struct.Struct('>H').unpack_from
+_unpack_u32 = struct.Struct('>I').unpack_from
+_unpack_u64 = struct.Struct('>Q').unpack_from
+_unpack_i8 = struct.Struct('>b').unpack_from
+_unpack_i16 = struct.Struct('>h').unpack_from
+_unpack_i32 = struct.Struct('>i').unpack_from
+_unpack_i64 = struct.Struct('>q').unpack_from
+_unpack_f32 = struct.Struct('>f').unpack_from
+_unpack_f64 = struct.Struct('>d').unpack_from
+_unpack_datetime = struct.Struct('>qi').unpack_from
+
+# Encoded form of recently seen short strings (mostly dict keys)
+_STR_CACHE_SIZE = 4096
+_STR_CACHE_MAX_LEN = 32
+
+
+class BinpackError(ValueError):
+    """Raised for unsupported values and for malformed or truncated data."""
+
+
+# --- Encoding ---
+
+def packb(obj):
+    """Serialize obj to bytes."""
+    if _msgpack is not None:
+        return _msgpack.packb(obj, default=_msgpack_default, use_bin_type=True, datetime=False)
+    buf = bytearray()
+    _make_packer(buf)(obj)
+    return bytes(buf)
+
+
+def _make_packer(buf):
+    """Return pack(obj), which appends obj's encoding to buf.
+
+    A closure rather than a class: locals are the fastest lookups, and
+    this function runs once per value.
+    """
+    strings = {}
+    cached = strings.get
+
+    def pack(obj):
+        cls = type(obj)
+        if cls is str:
+            encoded = cached(obj)
+            if encoded is None:
+                data = obj.encode('utf-8')
+                encoded = _header(len(data), 0xA0, 0xD9, 0xDA, 0xDB, 31) + data
+                if len(obj) <= _STR_CACHE_MAX_LEN and len(strings) < _STR_CACHE_SIZE:
+                    strings[obj] = encoded
+            buf.extend(encoded)
+        elif cls is int:
+            if 0 <= obj < 0x80:
+                buf.append(obj)
+            else:
+                buf.extend(_pack_int(obj))
+        elif cls is float:
+            buf.extend(_pack_f64(0xCB, obj))
+        elif cls is dict:
+            length = len(obj)
+            if length < 16:
+                buf.append(0x80 | length)
+            else:
+                buf.extend(_header(length, 0x80, None, 0xDE, 0xDF, 15))
+            for key, value in obj.items():
+                pack(key)
+                pack(value)
+        elif cls is list or cls is tuple:
+            length = len(obj)
+            if length < 16:
+                buf.append(0x90 | length)
+            else:
+                buf.extend(_header(length, 0x90, None, 0xDC, 0xDD, 15))
+            for item in obj:
+                pack(item)
+        elif obj is None:
+            buf.append(0xC0)
+        elif obj is True:
+            buf.append(0xC3)
+        elif obj is False:
+            buf.append(0xC2)
+        elif isinstance(obj, datetime):
+            buf.extend(_pack_datetime_ext(obj))
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
+            data = memoryview(obj).cast('B')
+            buf.extend(_header(len(data), None, 0xC4, 0xC5, 0xC6, -1))
+            buf.extend(data)
+        # Subclasses (IntEnum, OrderedDict, str enums, ...) take the slow path
+        elif isinstance(obj, str):
+            pack(str(obj))
+        elif isinstance(obj, int):
+            pack(int(obj))
+        elif isinstance(obj, float):
+            pack(float(obj))
+        elif isinstance(obj, dict):
+            pack(dict(obj))
+        elif isinstance(obj, (list, tuple)):
+            pack(list(obj))
+        else:
+            raise BinpackError(f"Object of type {cls.__name__} is not serializable")
+
+    return pack
+
+
+def _header(length, fix, code8, code16, code32, fix_max):
+    """Type byte(s) plus length for str/bin/array/map."""
+    if length <= fix_max:
+        return _pack_u8(fix | length)
+    if code8 is not None and length <= 0xFF:
+        return _pack_u8(code8) + _pack_u8(length)
+    if length <= 0xFFFF:
+        return _pack_u16(code16, length)
+    if length <= 0xFFFFFFFF:
+        return _pack_u32(code32, length)
+    raise BinpackError(f"Length {length} is too large")
+
+
+def _pack_int(value):
+    if 0 <= value < 0x80:
+        return _pack_u8(value)
+    if -32 <= value < 0:
+        return _pack_u8(value & 0xFF)
+    if value > 0:
+        if value <= 0xFF:
+            return _pack_u8(0xCC) + _pack_u8(value)
+        if value <= 0xFFFF:
+            return _pack_u16(0xCD, value)
+        if value <= 0xFFFFFFFF:
+            return _pack_u32(0xCE, value)
+        if value <= 0xFFFFFFFFFFFFFFFF:
+            return _pack_u64(0xCF, value)
+    else:
+        if value >= -0x80:
+            return _pack_i8(0xD0, value)
+        if value >= -0x8000:
+            return _pack_i16(0xD1, value)
+        if value >= -0x80000000:
+            return _pack_i32(0xD2, value)
+        if value >= -0x8000000000000000:
+            return _pack_i64(0xD3, value)
+    return _ext(*_bigint_ext(value))
+
+
+def _bigint_ext(value):
+    data = value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True)
+    return EXT_BIGINT, data
+
+
+def _datetime_ext(value):
+    if value.tzinfo is None:
+        micros = (value - _EPOCH) // timedelta(microseconds=1)
+        offset = _NAIVE
+    else:
+        micros = (value - _EPOCH_UTC) // timedelta(microseconds=1)
+        offset = int(value.utcoffset().total_seconds())
+    return EXT_DATETIME, _pack_datetime(micros, offset)
+
+
+def _pack_datetime_ext(value):
+    return _ext(*_datetime_ext(value))
+
+
+def _ext(ext_type, payload):
+    """Complete ext value: header, type byte and payload."""
+    length = len(payload)
+    if length <= 0xFF:
+        header = bytes((0xC7, length))
+    elif length <= 0xFFFF:
+        header = _pack_u16(0xC8, length)
+    else:
+        header = _pack_u32(0xC9, length)
+    return header + _pack_u8(ext_type) + payload
+
+
+# --- Decoding ---
+
+def unpackb(data):
+    """Deserialize one value from bytes-like data (which must hold exactly one)."""
+    if _msgpack is not None:
+        try:
+            return _msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False,
+                                    strict_map_key=False, timestamp=0)
+        except (_msgpack.ExtraData, _msgpack.FormatError, _msgpack.StackError,
+                ValueError, TypeError) as e:        # bad UTF-8, unhashable map keys
+            raise BinpackError(str(e) or "Malformed data") from None
+    # bytes indexing and slicing are the fastest reads available; a
+    # memoryview only lets bytearray/mmap input be read without a copy
+    if not isinstance(data, bytes):
+        data = memoryview(data).cast('B')
+    try:
+        value, end = _make_unpacker(data)(0)
+    except (IndexError, struct.error):
+        raise BinpackError("Truncated data") from None
+    except UnicodeDecodeError as e:
+        raise BinpackError(f"Invalid UTF-8 in string: {e.reason}") from None
+    except TypeError as e:                  # e.g. an array or map used as a map key
+        raise BinpackError(f"Malformed data: {e}") from None
+    except RecursionError:
+        raise BinpackError("Data nested too deeply") from None
+    if end != len(data):
+        raise BinpackError(f"{len(data) - end} extra bytes after value")
+    return value
+
+
+def _make_unpacker(data):
+    """Return unpack(pos) -> (value, next pos) reading from data.
+
+    Positions are passed and returned instead of kept on an object, so
+    the hot path does no attribute access at all.
+    """
+    strings = {}
+    cached = strings.get
+    bytes_data = isinstance(data, bytes)
+    size = len(data)
+
+    def take(pos, length):
+        end = pos + length
+        if end > size:
+            raise BinpackError("Truncated data")
+        raw = data[pos:end]
+        return (raw if bytes_data else raw.tobytes()), end
+
+    def string(pos, length):
+        raw, end = take(pos, length)
+        if length > _STR_CACHE_MAX_LEN:
+            return raw.decode('utf-8'), end
+        # Short strings (keys) repeat: decode each distinct one once and
+        # share the resulting object
+        value = cached(raw)
+        if value is None:
+            value = raw.decode('utf-8')
+            if len(strings) < _STR_CACHE_SIZE:
+                strings[raw] = value
+        return value, end
+
+    def unpack(pos):
+        code = data[pos]
+        pos += 1
+        # Ordered by how common each type is in typical records
+        if 0xA0 <= code <= 0xBF:
+            # string(), inlined: short strings are by far the most common value
+            end = pos + (code & 0x1F)
+            if end > size:
+                raise BinpackError("Truncated data")
+            raw = data[pos:end] if bytes_data else data[pos:end].tobytes()
+            value = cached(raw)
+            if value is None:
+                value = raw.decode('utf-8')
+                if len(strings) < _STR_CACHE_SIZE:
+                    strings[raw] = value
+            return value, end
+        if code <= 0x7F:
+            return code, pos
+        if code <= 0x8F:
+            result = {}
+            for _ in range(code & 0x0F):
+                key, pos = unpack(pos)
+                result[key], pos = unpack(pos)
+            return result, pos
+        if code <= 0x9F:
+            result = []
+            append = result.append
+            for _ in range(code & 0x0F):
+                item, pos = unpack(pos)
+                append(item)
+            return result, pos
+        if code == 0xCB:
+            return _unpack_f64(data, pos)[0], pos + 8
+        if code == 0xC0:
+            return None, pos
+        if code == 0xC3:
+            return True, pos
+        if code == 0xC2:
+            return False, pos
+        if code >= 0xE0:
+            return code - 0x100, pos
+
+        if code in _INTS:
+            width, unpack_from = _INTS[code]
+            return unpack_from(data, pos)[0], pos + width
+
+        if code in _LENGTHS:
+            kind, width, unpack_from = _LENGTHS[code]
+            length = unpack_from(data, pos)[0]
+            pos += width
+            if kind == 'str':
+                return string(pos, length)
+            if kind == 'bin':
+                return take(pos, length)
+            if kind == 'array':
+                result = []
+                append = result.append
+                for _ in range(length):
+                    item, pos = unpack(pos)
+                    append(item)
+                return result, pos
+            result = {}
+            for _ in range(length):
+                key, pos = unpack(pos)
+                result[key], pos = unpack(pos)
+            return result, pos
+
+        if code in _EXTS:
+            length = _EXTS[code]
+            if length is None:
+                width, unpack_from = _INTS[code + 5]       # 0xC7-0xC9 -> uint8/16/32
+                length = unpack_from(data, pos)[0]
+                pos += width
+            ext_type = _unpack_i8(data, pos)[0]
+            payload, pos = take(pos + 1, length)
+            return _unpack_ext(ext_type, payload), pos
+
+        raise BinpackError(f"Unknown type byte 0x{code:02X} at offset {pos - 1}")
+
+    return unpack
+
+
+# type byte -> (width, reader)
+_INTS = {0xCC: (1, _unpack_u8), 0xCD: (2, _unpack_u16), 0xCE: (4, _unpack_u32), 0xCF: (8, _unpack_u64),
+         0xD0: (1, _unpack_i8), 0xD1: (2, _unpack_i16), 0xD2: (4, _unpack_i32), 0xD3: (8, _unpack_i64),
+         0xCA: (4, _unpack_f32)}
+# type byte -> (kind, width of the length field, reader)
+_LENGTHS = {0xD9: ('str', 1, _unpack_u8), 0xDA: ('str', 2, _unpack_u16), 0xDB: ('str', 4, _unpack_u32),
+            0xC4: ('bin', 1, _unpack_u8), 0xC5: ('bin', 2, _unpack_u16), 0xC6: ('bin', 4, _unpack_u32),
+            0xDC: ('array', 2, _unpack_u16), 0xDD: ('array', 4, _unpack_u32),
+            0xDE: ('map', 2, _unpack_u16), 0xDF: ('map', 4, _unpack_u32)}
+# ext 8/16/32 carry a length; fixext 1/2/4/8/16 do not
+_EXTS = {0xC7: None, 0xC8: None, 0xC9: None,
+         0xD4: 1, 0xD5: 2, 0xD6: 4, 0xD7: 8, 0xD8: 16}
+
+
+def _unpack_ext(ext_type, payload):
+    if ext_type == EXT_DATETIME and len(payload) == 12:
+        micros, offset = _unpack_datetime(payload)
+        if offset == _NAIVE:
+            return _EPOCH + timedelta(microseconds=micros)
+        tz = timezone.utc if offset == 0 else timezone(timedelta(seconds=offset))
+        return (_EPOCH_UTC + timedelta(microseconds=micros)).astimezone(tz)
+    if ext_type == EXT_BIGINT:
+        return int.from_bytes(payload, 'big', signed=True)
+    raise BinpackError(f"Unsupported extension type {ext_type}")
+
+
+# --- Optional C accelerator ---
+
+def _msgpack_default(obj):
+    if isinstance(obj, datetime):
+        return _msgpack.ExtType(*_datetime_ext(obj))
+    if isinstance(obj, int):
+        return _msgpack.ExtType(*_bigint_ext(obj))
+    raise BinpackError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _msgpack_ext_hook(code, data):
+    return _unpack_ext(code, data)
+
+
+# --- Files ---
+
+def save_binary(data, filepath):
+    """Save data in binpack format (atomically, like Day-10's atomic_write_json)."""
+    blob = packb(data)
+    tmp = f"{filepath}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp, filepath)
+
+
+def load_binary(filepath):
+    """Load data saved with save_binary()."""
+    with open(filepath, 'rb') as f:
+        return unpackb(f.read())
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import gc
+    import json
+    import sys
+    import time
+
+    ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    # Records shaped like Day-10's user_profile and products examples
+    def user_profile(i):
+        return {
+            "user_id": f"U{i:07d}",
+            "name": f"User {i}",
+            "age": 18 + i % 60,
+            "email": f"user{i}@example.com",
+            "is_active": i % 3 != 0,
+            "balance": round(i * 1.25, 2),
+            "tags": ["python", "developer", "open-source"],
+            "address": {"street": f"{i} Main St", "city": "New York", "zip": "10001"},
+            "login_history": ["2024-01-10", "2024-01-12", "2024-01-15"],
+            "extra_field": None,
+        }
+
+    def product(i):
+        return {"id": i, "name": f"Product {i}", "price": round(9.99 + i % 1000, 2), "in_stock": i % 4 != 0}
+
+    # The JSON text is ASCII, so its length is its size in bytes; keeping
+    # it a str avoids holding a second copy at 1M rows
+    codecs = [
+        ("json indent=2", lambda d: json.dumps(d, indent=2), json.loads),
+        ("json compact", lambda d: json.dumps(d, separators=(',', ':')), json.loads),
+        ("binpack", packb, unpackb),
+    ]
+
+    for label, make in [("user_profile", user_profile), ("products", product)]:
+        rows = [make(i) for i in range(ROWS)]
+        print(f"\n{ROWS:,} {label} rows")
+        print(f"  {'format':<14} {'size (MB)':>10} {'encode (s)':>11} {'decode (s)':>11}")
+        for name, encode, decode in codecs:
+            gc.collect()
+            start = time.perf_counter()
+            blob = encode(rows)
+            encoded = time.perf_counter() - start
+            start = time.perf_counter()
+            decoded = decode(blob)
+            decoded_time = time.perf_counter() - start
+            assert decoded == rows
+            print(f"  {name:<14} {len(blob) / 1e6:>10.1f} {encoded:>11.2f} {decoded_time:>11.2f}")
+            del blob, decoded
+        del rows
+
+    # Types JSON cannot represent
+    sample = {'when': datetime(2024, 1, 15, 9, 30, tzinfo=timezone(timedelta(hours=2))),
+              'naive': datetime(2024, 1, 15, 9, 30, 0, 123456),
+              'raw': bytes(range(5)), 'big': 2 ** 100, 'neg': -(2 ** 70)}
+    assert unpackb(packb(sample)) == sample
+    print(f"\nRound trip of {sorted(sample)}: OK ({len(packb(sample))} bytes)")
@@ -0,0 +1,152 @@
+"""
+bundle.py — Frozen bytecode archive for fast cold starts
+
+A normal import stats several directories, opens the .py/.pyc files one
+by one and may compile source. For short-lived workers that adds up.
+
+build() compiles mypackage and its sibling modules once, with -O style
+optimisation (no asserts; docstrings are kept, some modules use their
+own __doc__), into a single archive file.
+install() reads that file with ONE open() and serves every module in it
+from memory; each code object is unmarshalled only when first imported.
+Modules keep __file__ pointing at their source, and a package's __path__
+is its real directory, so submodules added after the build are still
+imported from disk.
+
+    python bundle.py build app.frozen     # build step
+    python bundle.py bench                # compare against source imports
+
+    import bundle
+    bundle.install("app.frozen")
+    import mypackage                      # comes from the archive
+"""
+
+# Only cheap imports at module level: this module is itself imported on
+# every cold start, so build/bench dependencies are imported lazily.
+import marshal
+import sys
+from importlib.machinery import ModuleSpec
+
+__all__ = ['build', 'install', 'FrozenFinder']
+
+# Scripts that run on import and must not be bundled
+EXCLUDE = {'main.py', 'bundle.py'}
+
+# Bytecode is only valid for the interpreter version that produced it
+_HEADER = f"PYFROZEN2:{sys.implementation.cache_tag}\n".encode()
+
+
+def _here():
+    import os
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def _module_name(path, root):
+    parts = list(path.relative_to(root).with_suffix('').parts)
+    is_package = parts[-1] == '__init__'
+    if is_package:
+        parts.pop()
+    return '.'.join(parts), is_package
+
+
+def build(output, root=None, optimize=1):
+    """Compile every module under root into one archive; return module count."""
+    from pathlib import Path
+
+    root = Path(root or _here())
+    modules = {}
+    for path in sorted(root.rglob('*.py')):
+        if path.name in EXCLUDE or '__pycache__' in path.parts:
+            continue
+        name, is_package = _module_name(path, root)
+        code = compile(path.read_bytes(), str(path), 'exec',
+                       dont_inherit=True, optimize=optimize)
+        modules[name] = (is_package, str(path.resolve()), marshal.dumps(code))
+    Path(output).write_bytes(_HEADER + marshal.dumps(modules))
+    return len(modules)
+
+
+class FrozenFinder:
+    """Serve modules from a frozen archive loaded into memory."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(_HEADER):
+            raise ImportError(f"{path} is not a frozen archive for this Python version")
+        self.path = str(path)
+        self._modules = marshal.loads(memoryview(data)[len(_HEADER):])
+
+    def find_spec(self, fullname, path=None, target=None):
+        entry = self._modules.get(fullname)
+        if entry is None:
+            return None
+        is_package, origin, _ = entry
+        spec = ModuleSpec(fullname, self, origin=origin, is_package=is_package)
+        spec.has_location = True        # sets __file__, which some modules use
+        if is_package:
+            import os
+            spec.submodule_search_locations = [os.path.dirname(origin)]
+        return spec
+
+    def create_module(self, spec):
+        return None         # default module creation
+
+    def exec_module(self, module):
+        code = marshal.loads(self._modules[module.__name__][2])
+        exec(code, module.__dict__)
+
+
+def install(path):
+    """Read an archive and put its finder first on sys.meta_path."""
+    finder = FrozenFinder(path)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+# --- Startup benchmark ---
+
+_IMPORTS = 'import mypackage.demo, math_utils, utils, config, limited_module'
+
+
+def _startup_ms(code, runs):
+    import subprocess
+    import time
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=_here(), check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def bench(runs=20):
+    """Compare cold-start time of source imports and the frozen archive."""
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = Path(tmp) / 'app.frozen'
+        count = build(archive)
+
+        baseline = _startup_ms('pass', runs)
+        source = _startup_ms(_IMPORTS, runs)
+        frozen = _startup_ms(f'import bundle; bundle.install({str(archive)!r}); {_IMPORTS}', runs)
+
+    print(f"Archive: {count} modules, median of {runs} runs")
+    print(f"  interpreter only : {baseline:7.2f} ms")
+    print(f"  source imports   : {source:7.2f} ms  (+{source - baseline:.2f})")
+    print(f"  frozen archive   : {frozen:7.2f} ms  (+{frozen - baseline:.2f})")
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'bench'
+    if command == 'build':
+        output = sys.argv[2] if len(sys.argv) > 2 else 'app.frozen'
+        print(f"Wrote {build(output)} modules to {output}")
+    elif command == 'bench':
+        bench()
+    else:
+        sys.exit("usage: python bundle.py [build [OUTPUT] | bench]")
@@ -0,0 +1,315 @@
+"""
+config_store.py — Layered, hot-reloading configuration
+
+config.py is fixed at import time; changing it means importlib.reload()
+and every "from config import DATABASE" keeps the old dict. A
+ConfigStore merges three layers, later ones winning:
+
+    1. defaults        (e.g. the settings in config.py)
+    2. a JSON or TOML file
+    3. environment variables: MYAPP_API_TIMEOUT=60, MYAPP_DATABASE__HOST=db
+       ("__" separates nesting levels; values are parsed as JSON when
+       they can be, so 60 is an int and true a bool)
+
+    store = ConfigStore(defaults_from_module(config), "config.json")
+    store.get("DATABASE.host")           # one dict lookup
+    store.start(interval=1.0)            # reload when the file changes
+
+A file that does not exist (yet) is an empty layer: the store starts
+from defaults and environment and picks the file up when it appears.
+
+Each load builds a complete, frozen Snapshot and swaps it in with a
+single assignment, so a reader sees either the old or the new config,
+never a mix. Code that reads several values which must agree should
+take one snapshot and read them all from it:
+
+    snap = store.snapshot()
+    url = f"{snap['DATABASE.host']}:{snap['DATABASE.port']}"
+"""
+
+import json
+import os
+import threading
+import time
+
+from file_cache import _RACY_NS, _signature, freeze
+
+__all__ = ['ConfigStore', 'Snapshot', 'defaults_from_module']
+
+
+class Snapshot:
+    """Immutable merged configuration with O(1) dotted-key lookups."""
+
+    __slots__ = ('data', 'version', 'loaded_at', '_flat')
+
+    def __init__(self, data, version):
+        self.data = freeze(data)
+        self.version = version
+        self.loaded_at = time.time()
+        # "DATABASE", "DATABASE.host", ... -> value, for every node
+        self._flat = {}
+        _flatten(self.data, '', self._flat)
+
+    def __getitem__(self, key):
+        return self._flat[key]
+
+    def get(self, key, default=None):
+        return self._flat.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._flat
+
+    def __repr__(self):
+        return f"<Snapshot v{self.version}: {len(self.data)} settings>"
+
+
+def _flatten(mapping, prefix, flat):
+    for key, value in mapping.items():
+        name = f"{prefix}{key}"
+        flat[name] = value
+        if hasattr(value, 'items'):
+            _flatten(value, name + '.', flat)
+
+
+def defaults_from_module(module):
+    """Upper-case settings of a module such as config, as a dict."""
+    return {name: value for name, value in vars(module).items()
+            if name.isupper() and not callable(value)}
+
+
+class ConfigStore:
+    """Defaults + file + environment, merged into atomically swapped snapshots."""
+
+    def __init__(self, defaults=None, path=None, env_prefix='MYAPP_', environ=None):
+        self.defaults = defaults or {}
+        self.path = os.fspath(path) if path is not None else None
+        self.env_prefix = env_prefix
+        self.environ = os.environ if environ is None else environ
+        self.last_error = None
+        self._subscribers = []
+        self._validators = []
+        self._lock = threading.Lock()          # serializes loads, never taken by readers
+        self._signature = None
+        self._raw = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._snapshot = None
+        self.reload()
+
+    # --- Reading ---
+    def snapshot(self):
+        """The current Snapshot; it never changes, later loads replace it."""
+        return self._snapshot
+
+    def get(self, key, default=None):
+        return self._snapshot._flat.get(key, default)
+
+    def __getitem__(self, key):
+        return self._snapshot._flat[key]
+
+    def subscribe(self, callback):
+        """Call callback(old_snapshot, new_snapshot) after every swap."""
+        self._subscribers.append(callback)
+
+    def validate(self, callback):
+        """Call callback(new_snapshot) before every swap; if it raises, the swap is abandoned."""
+        self._validators.append(callback)
+
+    # --- Loading ---
+    def reload(self):
+        """Rebuild the snapshot from all layers and swap it in; return it.
+
+        If the file cannot be read or parsed, environment variables
+        conflict or a validator rejects the result, the exception
+        propagates and the current snapshot stays in place.
+        """
+        with self._lock:
+            signature, raw = self._read_file()
+            data = _merge(self.defaults, _parse(raw, self.path) if raw is not None else {})
+            data = _merge(data, _env_layer(self.environ, self.env_prefix, data))
+            old = self._snapshot
+            new = Snapshot(data, old.version + 1 if old else 1)
+            for validator in self._validators:
+                validator(new)
+            self._snapshot = new        # the swap: one reference assignment
+            self._signature, self._raw = signature, raw
+        for callback in self._subscribers:
+            callback(old, new)
+        return new
+
+    def check(self):
+        """Reload if the file changed; return True if a new snapshot was swapped in.
+
+        Errors are stored in last_error instead of raised, so a bad edit
+        leaves the running configuration alone.
+        """
+        try:
+            if not self._file_changed():
+                return False
+            self.reload()
+        except (OSError, ValueError) as e:       # JSONDecodeError and TOMLDecodeError are ValueErrors
+            self.last_error = e
+            return False
+        self.last_error = None
+        return True
+
+    def _read_file(self):
+        if self.path is None:
+            return None, None
+        # Stat before reading: if the file changes in between, the next
+        # check sees a new signature and loads it again
+        try:
+            signature = _signature(self.path)
+            with open(self.path, 'rb') as f:
+                return signature, f.read()
+        except FileNotFoundError:
+            return None, None
+
+    def _file_changed(self):
+        if self.path is None:
+            return False
+        try:
+            signature = _signature(self.path)
+        except FileNotFoundError:
+            return self._signature is not None
+        if signature != self._signature:
+            return True
+        if time.time_ns() - signature[0] < _RACY_NS:
+            with open(self.path, 'rb') as f:
+                return f.read() != self._raw
+        return False
+
+    # --- Background polling ---
+    def start(self, interval=1.0):
+        """Check the file every interval seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                # check() handles bad files; anything else (a failing
+                # subscriber or validator) must not end polling either
+                try:
+                    self.check()
+                except Exception as e:
+                    self.last_error = e
+
+        self._thread = threading.Thread(target=run, name='config-store', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+def _parse(raw, path):
+    if path.endswith('.toml'):
+        import tomllib          # Python 3.11+
+        return tomllib.loads(raw.decode('utf-8'))
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object at the top level, got {type(data).__name__}")
+    return data
+
+
+def _merge(base, override):
+    """Deep merge: nested dicts are merged, anything else is replaced."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _env_layer(environ, prefix, current):
+    """Nested dict of overrides from PREFIX_A__B=value variables.
+
+    Each name segment matches an existing key case-insensitively
+    (MYAPP_DATABASE__HOST -> DATABASE.host); unknown keys are used as written.
+    A variable that sets a key another one nests under (MYAPP_DATABASE
+    and MYAPP_DATABASE__PORT) raises ValueError.
+    """
+    layer = {}
+    for name, text in environ.items():
+        if not name.startswith(prefix) or len(name) == len(prefix):
+            continue
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = text
+        target, known = layer, current
+        segments = name[len(prefix):].split('__')
+        for i, segment in enumerate(segments):
+            if isinstance(known, dict):
+                segment = next((key for key in known if key.lower() == segment.lower()), segment)
+                known = known.get(segment)
+            else:
+                known = None
+            if i == len(segments) - 1:
+                if isinstance(target.get(segment), dict):
+                    raise ValueError(f"{name} conflicts with variables nested under it")
+                target[segment] = value
+            else:
+                target = target.setdefault(segment, {})
+                if not isinstance(target, dict):
+                    raise ValueError(f"{name} is nested under a key another variable sets")
+    return layer
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+    import timeit
+
+    import config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.json')
+        with open(path, 'w') as f:
+            json.dump({'DATABASE': {'host': 'db.internal'}, 'FEATURES': {'beta_features': True}}, f)
+
+        environ = {'MYAPP_API_TIMEOUT': '60', 'MYAPP_DATABASE__PORT': '6432'}
+        store = ConfigStore(defaults_from_module(config), path, environ=environ)
+        snap = store.snapshot()
+        print(f"{snap}: host={snap['DATABASE.host']} port={snap['DATABASE.port']} "
+              f"timeout={snap['API_TIMEOUT']} beta={snap['FEATURES.beta_features']}")
+
+        n = 1_000_000
+        per_get = timeit.timeit(lambda: store.get('DATABASE.host'), number=n) / n * 1e9
+        print(f"store.get: {per_get:.0f} ns per lookup")
+
+        # Readers on other threads never see host and port from different versions
+        pairs = {('db.internal', 6432): 1, ('db2.internal', 7432): 2}
+        torn = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                snap = store.snapshot()
+                if pairs.get((snap['DATABASE.host'], snap['DATABASE.port'])) is None:
+                    torn.append(snap)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        store.subscribe(lambda old, new: print(f"Swapped {old} -> {new}"))
+        store.start(interval=0.05)
+        for host, port in [('db2.internal', 7432), ('db.internal', 6432)]:
+            environ['MYAPP_DATABASE__PORT'] = str(port)
+            with open(path, 'w') as f:
+                json.dump({'DATABASE': {'host': host}}, f)
+            time.sleep(0.2)
+        with open(path, 'w') as f:
+            f.write('{ not json')
+        time.sleep(0.2)
+        store.stop()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        print(f"Torn reads: {len(torn)}; after a bad edit: host={store['DATABASE.host']}, "
+              f"last_error={store.last_error!r}")
@@ -0,0 +1,782 @@
+"""
+db_pool.py — Connection pools keyed by config.get_database_url()
+
+Opening a database connection per job costs a TCP handshake, TLS and
+authentication every time. A pool keeps connections open and hands
+them out again:
+
+    from db_pool import get_pool
+
+    pool = get_pool()                       # one pool per URL, default config.get_database_url()
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+
+    # asyncio services
+    pool = get_async_pool("sqlite:///app.db")
+    async with pool.connection() as conn:
+        ...
+
+Pools keep between min_size and max_size connections. A connection
+idle for health_check_interval seconds is checked with a trivial query
+before it is handed out; one idle for max_idle seconds is closed (down
+to min_size), on release and by a reaper that runs every reap_interval
+seconds (default max_idle / 2; 0 disables it), so a pool that goes quiet
+still shrinks. When every connection is busy, callers wait up to timeout
+seconds and then get PoolTimeout.
+
+An asyncio pool belongs to one event loop: get_async_pool() keeps one
+per URL and loop, so each asyncio.run() gets its own.
+
+Metrics go to metrics.REGISTRY, labelled with the URL (password removed):
+    db_pool_wait_seconds        time blocked because the pool was exhausted
+    db_pool_checkout_seconds    total time to obtain a connection, including
+                                health checks and opening new connections
+    db_pool_connections_opened_total / db_pool_connections_closed_total{reason}
+
+sqlite:/// URLs use sqlite3; postgresql:// URLs need psycopg (or psycopg2).
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+from metrics import REGISTRY
+
+__all__ = ['ConnectionPool', 'AsyncConnectionPool', 'PoolTimeout',
+           'get_pool', 'get_async_pool', 'close_all', 'connect_url']
+
+
+class PoolTimeout(TimeoutError):
+    """No connection became available within the timeout."""
+
+
+def connect_url(url):
+    """Open a DB-API connection for a database URL."""
+    scheme = urlsplit(url).scheme
+    if scheme == 'sqlite':
+        # sqlite:///relative.db, sqlite:////absolute.db, sqlite:// for :memory:
+        path = url[len('sqlite:///'):] or ':memory:'
+        # Pooled connections move between threads, one thread at a time
+        return sqlite3.connect(path, check_same_thread=False)
+    if scheme in ('postgresql', 'postgres'):
+        try:
+            import psycopg
+        except ImportError:
+            import psycopg2 as psycopg
+        return psycopg.connect(url)
+    raise ValueError(f"Unsupported database URL scheme: {scheme!r}")
+
+
+def _check(conn, query):
+    cur = conn.cursor()
+    try:
+        cur.execute(query)
+        cur.fetchone()
+    finally:
+        cur.close()
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _redact(url):
+    parts = urlsplit(url)
+    if parts.password is None:
+        return url
+    netloc = parts.netloc.replace(f":{parts.password}@", ":***@")
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+class _Idle:
+    __slots__ = ('conn', 'released', 'checked')
+
+    def __init__(self, conn, now):
+        self.conn = conn
+        self.released = now      # when it was last returned to the pool
+        self.checked = now       # when it was last known to work
+
+
+class _PoolCore:
+    """Bookkeeping shared by the thread and asyncio pools (no I/O, no waiting)."""
+
+    def __init__(self, url, min_size, max_size, timeout, max_idle,
+                 health_check, health_check_interval, reap_interval, registry):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("need 0 <= min_size <= max_size and max_size >= 1")
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check = health_check
+        self.health_check_interval = health_check_interval
+        self.reap_interval = max_idle / 2 if reap_interval is None else reap_interval
+        self.closed = False
+        # Most recently released on the right: reuse warm connections,
+        # let the ones on the left go idle and be evicted
+        self._idle = deque()
+        self._size = 0           # open connections: idle + in use + being opened
+        self._in_use = 0
+        # Tickets of waiting callers, first come first served: without this
+        # a thread that releases and immediately re-acquires starves waiters
+        self._waiters = deque()
+
+        registry = registry or REGISTRY
+        label = _redact(url)
+        self._wait = registry.histogram('db_pool_wait_seconds', pool=label)
+        self._checkout = registry.histogram('db_pool_checkout_seconds', pool=label)
+        self._opened = registry.counter('db_pool_connections_opened_total', pool=label)
+        self._closed = {reason: registry.counter('db_pool_connections_closed_total', pool=label, reason=reason)
+                        for reason in ('idle', 'unhealthy', 'error', 'pool_closed')}
+
+    def _take(self, now, ticket=None):
+        """An idle connection and whether it needs a health check, a
+        reservation to open a new one (None, False), or False if full or
+        if it is another waiter's turn."""
+        if self._waiters and self._waiters[0] is not ticket:
+            return False
+        if self._idle:
+            idle = self._idle.pop()
+            self._in_use += 1
+            return idle, now - idle.checked >= self.health_check_interval
+        if self._size < self.max_size:
+            self._size += 1
+            self._in_use += 1
+            return None, False
+        return False
+
+    def _give_back(self, conn, now):
+        self._in_use -= 1
+        self._idle.append(_Idle(conn, now))
+
+    def _drop(self, reason):
+        """Forget a checked-out connection that is being closed."""
+        self._size -= 1
+        self._in_use -= 1
+        self._closed[reason].inc()
+
+    def _expired(self, now):
+        """Pop idle connections past max_idle (oldest first, keeping min_size)."""
+        expired = []
+        while (self._idle and self._size > self.min_size
+               and now - self._idle[0].released >= self.max_idle):
+            expired.append(self._idle.popleft().conn)
+            self._size -= 1
+            self._closed['idle'].inc()
+        return expired
+
+    def _drain(self):
+        conns = [idle.conn for idle in self._idle]
+        self._idle.clear()
+        self._size -= len(conns)
+        self._closed['pool_closed'].inc(len(conns))
+        return conns
+
+    def _reaps(self):
+        return 0 < self.reap_interval < math.inf
+
+    def stats(self):
+        return {'size': self._size, 'idle': len(self._idle), 'in_use': self._in_use,
+                'min_size': self.min_size, 'max_size': self.max_size}
+
+
+class ConnectionPool(_PoolCore):
+    """Thread-safe pool of DB-API connections."""
+
+    def __init__(self, url, connect=None, min_size=1, max_size=10, timeout=30.0,
+                 max_idle=300.0, health_check='SELECT 1', health_check_interval=30.0,
+                 reap_interval=None, registry=None):
+        super().__init__(url, min_size, max_size, timeout, max_idle,
+                         health_check, health_check_interval, reap_interval, registry)
+        self._connect = connect or connect_url
+        self._cond = threading.Condition()
+        self._stop_reaper = threading.Event()
+        for _ in range(min_size):
+            with self._cond:
+                self._size += 1
+                self._in_use += 1
+            conn = self._open()
+            with self._cond:
+                self._give_back(conn, time.monotonic())
+        if self._reaps():
+            _start_reaper(self)
+
+    def _open(self):
+        """Connect for a slot already counted in _size and _in_use."""
+        try:
+            conn = self._connect(self.url)
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify_all()
+            raise
+        self._opened.inc()
+        return conn
+
+    def acquire(self, timeout=None):
+        """Check out a connection; pair with release(), or use connection()."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter_ns()
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self.closed:
+                    raise RuntimeError("Pool is closed")
+                taken = self._take(time.monotonic())
+                if taken is False:
+                    wait_start = time.perf_counter_ns()
+                    ticket = object()
+                    self._waiters.append(ticket)
+                    try:
+                        while taken is False:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0 or self.closed:
+                                raise PoolTimeout(f"No connection available within {timeout}s "
+                                                  f"({self.max_size} in use)")
+                            self._cond.wait(remaining)
+                            taken = self._take(time.monotonic(), ticket)
+                    finally:
+                        self._waiters.remove(ticket)
+                        self._cond.notify_all()      # the next waiter may go now
+                        self._wait.observe_ns(time.perf_counter_ns() - wait_start)
+
+            # Connecting and health checks happen outside the lock
+            idle, needs_check = taken
+            if idle is None:
+                conn = self._open()
+                break
+            if not needs_check:
+                conn = idle.conn
+                break
+            try:
+                _check(idle.conn, self.health_check)
+                conn = idle.conn
+                break
+            except Exception:
+                _close(idle.conn)
+                with self._cond:
+                    self._drop('unhealthy')
+                    self._cond.notify_all()
+                # and try again: another idle connection or a new one
+        self._checkout.observe_ns(time.perf_counter_ns() - start)
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection; discard=True closes it instead (e.g. after errors)."""
+        if not discard:
+            try:
+                conn.rollback()          # never hand out an open transaction
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        with self._cond:
+            if discard or self.closed:
+                self._drop('error' if discard else 'pool_closed')
+                expired = self._expired(now)
+                close = [conn, *expired]
+            else:
+                self._give_back(conn, now)
+                close = self._expired(now)
+            self._cond.notify_all()
+        for old in close:
+            _close(old)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=_broken(conn))
+            raise
+        self.release(conn)
+
+    def evict_idle(self):
+        """Close connections idle longer than max_idle; return how many."""
+        with self._cond:
+            expired = self._expired(time.monotonic())
+        for conn in expired:
+            _close(conn)
+        return len(expired)
+
+    def close(self):
+        """Close idle connections now and in-use ones when they are released."""
+        self._stop_reaper.set()
+        with self._cond:
+            self.closed = True
+            conns = self._drain()
+            self._cond.notify_all()
+        for conn in conns:
+            _close(conn)
+
+    def stats(self):
+        with self._cond:
+            return super().stats()
+
+
+def _start_reaper(pool):
+    """Daemon thread calling pool.evict_idle() every reap_interval seconds.
+
+    It holds only a weak reference, so an unused pool can still be
+    garbage collected.
+    """
+    ref = weakref.ref(pool)
+    interval, stop = pool.reap_interval, pool._stop_reaper
+
+    def run():
+        while not stop.wait(interval):
+            pool = ref()
+            if pool is None or pool.closed:
+                return
+            pool.evict_idle()
+            del pool
+
+    threading.Thread(target=run, name='db-pool-reaper', daemon=True).start()
+
+
+def _broken(conn):
+    """After an exception: keep the connection only if it still answers."""
+    try:
+        conn.rollback()
+        return False
+    except Exception:
+        return True
+
+
+class AsyncConnectionPool(_PoolCore):
+    """asyncio pool.
+
+    connect(url) may be a coroutine function (e.g. an asyncpg-style
+    driver) or a blocking one, which then runs in a worker thread; the
+    same applies to health checks and closing. Connections from blocking
+    drivers should also be used via asyncio.to_thread().
+    """
+
+    def __init__(self, url, connect=None, min_size=0, max_size=10, timeout=30.0,
+                 max_idle=300.0, health_check='SELECT 1', health_check_interval=30.0,
+                 reap_interval=None, registry=None):
+        super().__init__(url, min_size, max_size, timeout, max_idle,
+                         health_check, health_check_interval, reap_interval, registry)
+        self._connect = connect or connect_url
+        self._cond = None        # created inside the running loop, with the reaper
+        self._reaper = None
+        self._cleanups = set()   # close-and-notify tasks of cancelled operations
+
+    def _condition(self):
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+            if self._reaps():
+                self._reaper = asyncio.get_running_loop().create_task(_reap(weakref.ref(self)))
+        return self._cond
+
+    async def _call(self, func, *args):
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _untake(self, taken):
+        """Undo a _take() whose caller was cancelled before using it."""
+        idle, _ = taken
+        self._in_use -= 1
+        if idle is None:
+            self._size -= 1      # the reserved slot was never opened
+        else:
+            self._idle.append(idle)
+
+    def _discard_cancelled(self, conn, pending):
+        """A task was cancelled while pending (a rollback or health check in
+        a worker thread) used conn: forget its slot now, without awaiting,
+        and close conn in the background once pending has finished."""
+        self._drop('error')
+
+        async def cleanup():
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()             # retrieved, so never logged
+            await self._call(_close, conn)
+            async with self._cond:
+                self._cond.notify_all()
+
+        task = asyncio.get_running_loop().create_task(cleanup())
+        self._cleanups.add(task)
+        task.add_done_callback(self._cleanups.discard)
+
+    async def fill(self):
+        """Open connections up to min_size (call once the loop is running)."""
+        while True:
+            async with self._condition():
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+                self._in_use += 1
+            conn = await self._open()
+            async with self._cond:
+                self._give_back(conn, time.monotonic())
+                self._cond.notify_all()
+
+    async def _open(self):
+        try:
+            conn = await self._call(self._connect, self.url)
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify_all()
+            raise
+        self._opened.inc()
+        return conn
+
+    async def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        cond = self._condition()
+        start = time.perf_counter_ns()
+        while True:
+            async with cond:
+                if self.closed:
+                    raise RuntimeError("Pool is closed")
+                taken = self._take(time.monotonic())
+                if taken is False:
+                    wait_start = time.perf_counter_ns()
+                    ticket = object()
+                    self._waiters.append(ticket)
+
+                    def ready():
+                        nonlocal taken
+                        if not self.closed:
+                            taken = self._take(time.monotonic(), ticket)
+                        return self.closed or taken is not False
+                    try:
+                        await asyncio.wait_for(cond.wait_for(ready), timeout)
+                    except asyncio.TimeoutError:
+                        if taken is False:      # else it arrived just in time: use it
+                            raise PoolTimeout(f"No connection available within {timeout}s "
+                                              f"({self.max_size} in use)") from None
+                    except asyncio.CancelledError:
+                        if taken is not False:
+                            self._untake(taken)
+                        raise
+                    finally:
+                        self._waiters.remove(ticket)
+                        cond.notify_all()
+                        self._wait.observe_ns(time.perf_counter_ns() - wait_start)
+                    if taken is False:
+                        raise RuntimeError("Pool is closed")
+
+            idle, needs_check = taken
+            if idle is None:
+                conn = await self._open()
+                break
+            if not needs_check:
+                conn = idle.conn
+                break
+            # Shielded, so a cancelled caller can wait for the check to finish
+            # before the connection is closed under the worker thread
+            check = asyncio.ensure_future(self._call(_check, idle.conn, self.health_check))
+            try:
+                await asyncio.shield(check)
+                conn = idle.conn
+                break
+            except asyncio.CancelledError:
+                self._discard_cancelled(idle.conn, check)
+                raise
+            except Exception:
+                await self._call(_close, idle.conn)
+                async with cond:
+                    self._drop('unhealthy')
+                    cond.notify_all()
+        self._checkout.observe_ns(time.perf_counter_ns() - start)
+        return conn
+
+    async def release(self, conn, discard=False):
+        if not discard:
+            rollback = asyncio.ensure_future(self._call(conn.rollback))
+            try:
+                await asyncio.shield(rollback)
+            except asyncio.CancelledError:
+                self._discard_cancelled(conn, rollback)
+                raise
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        async with self._condition():
+            if discard or self.closed:
+                self._drop('error' if discard else 'pool_closed')
+                close = [conn, *self._expired(now)]
+            else:
+                self._give_back(conn, now)
+                close = self._expired(now)
+            self._cond.notify_all()
+        for old in close:
+            await self._call(_close, old)
+
+    async def evict_idle(self):
+        """Close connections idle longer than max_idle; return how many."""
+        async with self._condition():
+            expired = self._expired(time.monotonic())
+        for conn in expired:
+            await self._call(_close, conn)
+        return len(expired)
+
+    @asynccontextmanager
+    async def connection(self, timeout=None):
+        conn = await self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            await self.release(conn, discard=await self._call(_broken, conn))
+            raise
+        await self.release(conn)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+        async with self._condition():
+            self.closed = True
+            conns = self._drain()
+            self._cond.notify_all()
+        for conn in conns:
+            await self._call(_close, conn)
+
+
+async def _reap(ref):
+    """Task calling evict_idle() every reap_interval seconds (weak reference, like _start_reaper)."""
+    while True:
+        pool = ref()
+        if pool is None or pool.closed:
+            return
+        interval = pool.reap_interval
+        del pool
+        await asyncio.sleep(interval)
+        pool = ref()
+        if pool is None or pool.closed:
+            return
+        await pool.evict_idle()
+        del pool
+
+
+# --- Pools keyed by URL ---
+
+_pools = {}
+_async_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _default_url():
+    import config
+    return config.get_database_url()
+
+
+def get_pool(url=None, **options):
+    """The process-wide ConnectionPool for url (default: config.get_database_url()).
+
+    options apply only when the pool is created by this call.
+    """
+    url = url or _default_url()
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None or pool.closed:
+            pool = _pools[url] = ConnectionPool(url, **options)
+        return pool
+
+
+def get_async_pool(url=None, **options):
+    """The AsyncConnectionPool for url in the running event loop.
+
+    Must be called from a coroutine. Pools of loops that have closed
+    are forgotten.
+    """
+    url = url or _default_url()
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        for key in [key for key in _async_pools if key[1].is_closed()]:
+            del _async_pools[key]
+        pool = _async_pools.get((url, loop))
+        if pool is None or pool.closed:
+            pool = _async_pools[url, loop] = AsyncConnectionPool(url, **options)
+        return pool
+
+
+def close_all():
+    """Close every thread pool created by get_pool() (async pools: await pool.close())."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from metrics import MetricsRegistry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'app.db')}"
+        setup = connect_url(url)
+        setup.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, result INTEGER)")
+        setup.commit()
+        setup.close()
+
+        def job(pool, i):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO jobs (result) VALUES (?)", (i * i,))
+                conn.commit()
+                time.sleep(0.002)       # simulated work while holding the connection
+
+        # Connection per job vs pooled, 16 worker threads
+        def unpooled(i):
+            conn = connect_url(url)
+            try:
+                conn.execute("INSERT INTO jobs (result) VALUES (?)", (i * i,))
+                conn.commit()
+                time.sleep(0.002)
+            finally:
+                conn.close()
+
+        registry = MetricsRegistry()
+        pool = ConnectionPool(url, min_size=2, max_size=4, registry=registry)
+        for label, run in [("connection per job", unpooled), ("pooled (max 4)", lambda i: job(pool, i))]:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(16) as executor:
+                list(executor.map(run, range(500)))
+            print(f"{label:<20} {time.perf_counter() - start:.2f}s for 500 jobs")
+        print(f"Pool: {pool.stats()}")
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1000
+        assert pool.stats()['in_use'] == 0 and pool.stats()['size'] <= 4
+        for entry in registry.snapshot():
+            if entry['type'] == 'histogram':
+                p99 = entry['quantiles'][0.99]
+                print(f"  {entry['name']:<26} count={entry['count']:<5} p99={p99 * 1e3 if p99 else 0:.3f} ms")
+            else:
+                print(f"  {entry['name']:<40} {entry['labels'].get('reason', ''):<12} {entry['value']}")
+
+        # Timeouts
+        small = ConnectionPool(url, min_size=0, max_size=1, timeout=0.05, registry=registry)
+        held = small.acquire()
+        try:
+            small.acquire()
+        except PoolTimeout as e:
+            print(f"PoolTimeout: {e}")
+        else:
+            raise AssertionError("acquire() on an exhausted pool did not time out")
+        small.release(held)
+        with small.connection(timeout=0.05):     # released connections are handed out again
+            pass
+
+        # Health checks replace connections that died while idle
+        checked = ConnectionPool(url, min_size=1, max_size=2, health_check_interval=0, registry=registry)
+        checked._idle[-1].conn.close()
+        unhealthy = registry.counter('db_pool_connections_closed_total', pool=url, reason='unhealthy')
+        with checked.connection() as conn:
+            print(f"After a dead idle connection: {conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]} rows")
+        assert unhealthy.value == 1 and checked.stats()['size'] == 1
+
+        # Idle eviction down to min_size
+        evicting = ConnectionPool(url, min_size=1, max_size=4, max_idle=0.05, reap_interval=0, registry=registry)
+        conns = [evicting.acquire() for _ in range(4)]
+        for conn in conns:
+            evicting.release(conn)
+        time.sleep(0.1)
+        evicted = evicting.evict_idle()
+        print(f"Evicted {evicted} idle connections: {evicting.stats()}")
+        assert evicted == 3 and evicting.stats()['size'] == 1
+
+        # ... and by the reaper, with no further calls into the pool
+        reaped = ConnectionPool(url, min_size=1, max_size=4, max_idle=0.05, registry=registry)
+        conns = [reaped.acquire() for _ in range(4)]
+        for conn in conns:
+            reaped.release(conn)
+        time.sleep(0.2)
+        print(f"Reaper: {reaped.stats()}")
+        assert reaped.stats()['size'] == 1
+
+        # asyncio: one pool per event loop, so asyncio.run() can be called again
+        async def main():
+            apool = get_async_pool(url, min_size=1, max_size=3, max_idle=0.05, registry=registry)
+            assert get_async_pool(url) is apool
+            await apool.fill()
+
+            async def ajob(i):
+                async with apool.connection() as conn:
+                    return (await asyncio.to_thread(lambda: conn.execute("SELECT ?", (i,)).fetchone()))[0]
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(ajob(i) for i in range(300)))
+            print(f"asyncio pool: 300 jobs in {time.perf_counter() - start:.2f}s, {apool.stats()}")
+            assert results == list(range(300)) and apool.stats()['size'] <= 3
+            await asyncio.sleep(0.2)
+            assert apool.stats()['size'] == 1, apool.stats()       # reaped back to min_size
+            return apool
+
+        first = asyncio.run(main())
+        second = asyncio.run(main())
+        assert first is not second
+
+        # Cancellation during a rollback, a health check or a wait never
+        # leaks a slot: the pool still hands out max_size connections
+        class SlowConnection:
+            """sqlite3 connection whose rollback and queries take a while."""
+
+            def __init__(self, url):
+                self.conn = connect_url(url)
+
+            def rollback(self):
+                time.sleep(0.05)
+                self.conn.rollback()
+
+            def cursor(self):
+                time.sleep(0.05)
+                return self.conn.cursor()
+
+            def close(self):
+                self.conn.close()
+
+        async def cancellation():
+            apool = AsyncConnectionPool(url, connect=SlowConnection, max_size=2, timeout=1,
+                                        health_check_interval=0, registry=registry)
+
+            async def use():
+                async with apool.connection():
+                    pass
+
+            for phase in ('rollback', 'health check'):
+                if phase == 'health check':     # idle connections, so acquire() checks them
+                    conns = [await apool.acquire() for _ in range(2)]
+                    for conn in conns:
+                        await apool.release(conn)
+                # Two tasks are cancelled in the 50 ms rollback or health check,
+                # the third while waiting for a connection
+                tasks = [asyncio.create_task(use()) for _ in range(3)]
+                await asyncio.sleep(0.02)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await asyncio.gather(*apool._cleanups)
+                assert apool.stats()['in_use'] == 0, (phase, apool.stats())
+            conns = [await apool.acquire() for _ in range(2)]
+            assert apool.stats()['in_use'] == 2
+            for conn in conns:
+                await apool.release(conn)
+            await apool.close()
+            print(f"After cancellations: {apool.stats()}")
+
+        asyncio.run(cancellation())
+        for p in (pool, small, checked, evicting, reaped):
+            p.close()
+        print("All checks passed")
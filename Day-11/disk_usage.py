@@ -0,0 +1,214 @@
+"""
+disk_usage.py — Parallel du: per-directory totals over large trees
+
+utils.format_size() formats a byte count; this module computes the
+counts. Directories are listed with os.scandir() by a pool of threads
+(scandir and stat release the GIL, so listings overlap their I/O), and
+each file is measured with DirEntry.stat(), whose result is cached on
+the entry so no path is stat-ed twice.
+
+A directory's total is final once all of its subdirectories are, so
+results stream out while the scan is still running, children before
+parents, the same order du prints them:
+
+    for usage in iter_usage("/data", max_depth=2, exclude=["*.tmp", ".git"]):
+        print(format_size(usage.bytes), usage.path)
+
+    python disk_usage.py /data --max-depth 2 --exclude '*.tmp' --workers 32
+"""
+
+import argparse
+import os
+import queue
+import re
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
+
+from utils import format_size
+
+__all__ = ['DirUsage', 'iter_usage', 'report']
+
+DirUsage = namedtuple('DirUsage', 'path depth bytes files')
+
+_DONE = object()
+
+
+class _Dir:
+    __slots__ = ('path', 'parent', 'depth', 'bytes', 'files', 'pending')
+
+    def __init__(self, path, parent, depth, own_bytes):
+        self.path = path
+        self.parent = parent
+        self.depth = depth
+        self.bytes = own_bytes      # the directory's own size, then its contents
+        self.files = 0
+        # Outstanding work: this directory's own listing plus one per
+        # subdirectory whose total has not been added yet
+        self.pending = 1
+
+
+class _Scan:
+    def __init__(self, root, workers, max_depth, exclude, apparent_size, on_error):
+        self.root = os.fspath(root)
+        self.on_error = on_error
+        # Root-relative path of an entry: entry.path with this many
+        # characters removed (paths are all built from the root string)
+        self.prefix_len = len(os.path.join(self.root, ''))
+        self.max_depth = max_depth
+        # All patterns as one regex, tried on both name and relative path
+        patterns = list(exclude)
+        self.exclude = re.compile('|'.join(translate(p) for p in patterns)).match if patterns else None
+        self.apparent_size = apparent_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='du')
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.seen_inodes = set()        # hard-linked files, counted once like du
+        self.stopped = False
+
+    def _size(self, st):
+        if self.apparent_size or not hasattr(st, 'st_blocks'):     # no st_blocks on Windows
+            return st.st_size
+        return st.st_blocks * 512
+
+    def start(self):
+        root = _Dir(self.root, None, 0, self._size(os.stat(self.root)))
+        self.pool.submit(self._list, root)
+
+    def _list(self, directory):
+        if self.stopped:
+            return
+        subdirs = []
+        size = files = 0
+        # Runs once per file: everything it touches is a local
+        excluded, prefix_len, size_of = self.exclude, self.prefix_len, self._size
+        try:
+            with os.scandir(directory.path) as entries:
+                for entry in entries:
+                    if excluded and (excluded(entry.name) or excluded(entry.path[prefix_len:])):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(_Dir(entry.path, directory, directory.depth + 1, size_of(st)))
+                            continue
+                        if st.st_nlink > 1:
+                            key = (st.st_dev, st.st_ino)
+                            with self.lock:
+                                if key in self.seen_inodes:
+                                    continue
+                                self.seen_inodes.add(key)
+                        size += size_of(st)
+                        files += 1
+                    except OSError as e:
+                        self.on_error(e)
+        except OSError as e:
+            self.on_error(e)
+        finally:
+            # Whatever happened, complete the directory, or the scan never ends
+            with self.lock:
+                directory.bytes += size
+                directory.files += files
+                # Count the subdirectories before submitting them, so none
+                # can finish and complete this directory early
+                directory.pending += len(subdirs)
+            for subdir in subdirs:
+                self.pool.submit(self._list, subdir)
+            self._complete(directory)
+
+    def _complete(self, directory):
+        """Drop one pending item; publish and roll up totals that became final."""
+        with self.lock:
+            while directory is not None:
+                directory.pending -= 1
+                if directory.pending:
+                    return
+                if self.max_depth is None or directory.depth <= self.max_depth:
+                    self.results.put(DirUsage(directory.path, directory.depth,
+                                              directory.bytes, directory.files))
+                parent = directory.parent
+                if parent is not None:
+                    parent.bytes += directory.bytes
+                    parent.files += directory.files
+                directory = parent
+        self.results.put(_DONE)
+
+    def stop(self):
+        self.stopped = True
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _print_error(error):
+    print(f"disk_usage: {error}", file=sys.stderr)
+
+
+def iter_usage(root, workers=16, max_depth=None, exclude=(), apparent_size=False, on_error=None):
+    """Yield DirUsage(path, depth, bytes, files) for root and its subdirectories.
+
+    bytes counts allocated blocks like du (apparent_size=True counts file
+    lengths instead) and includes everything below the directory.
+    max_depth limits which directories are reported, not what is
+    counted. exclude holds glob patterns matched against entry names and
+    root-relative paths; matching files and directories are skipped.
+    Symbolic links are not followed.
+
+    Entries that cannot be read are skipped and passed to on_error
+    (default: printed to stderr); a root that cannot be accessed raises
+    OSError.
+    """
+    scan = _Scan(root, workers, max_depth, exclude, apparent_size, on_error or _print_error)
+    scan.start()
+    try:
+        while True:
+            item = scan.results.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        scan.stop()
+
+
+def report(root, out=None, **options):
+    """Write a du-style report line by line as totals become known; return the root's usage."""
+    out = out or sys.stdout
+    usage = None
+    for usage in iter_usage(root, **options):
+        out.write(f"{format_size(usage.bytes):>12} {usage.files:>12,}  {usage.path}\n")
+        out.flush()
+    return usage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize disk usage of a directory tree.")
+    parser.add_argument('root', nargs='?', default='.')
+    parser.add_argument('-d', '--max-depth', type=int, metavar='N', help="only report directories N levels deep")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip entries matching GLOB (repeatable)")
+    parser.add_argument('--workers', type=int, default=16, metavar='N')
+    parser.add_argument('--apparent-size', action='store_true', help="count file lengths, not allocated blocks")
+    args = parser.parse_args(argv)
+
+    errors = []
+
+    def on_error(error):
+        errors.append(error)
+        _print_error(error)
+
+    print(f"{'size':>12} {'files':>12}  path")
+    try:
+        report(args.root, max_depth=args.max_depth, exclude=args.exclude,
+               workers=args.workers, apparent_size=args.apparent_size, on_error=on_error)
+    except BrokenPipeError:             # e.g. piped into head
+        sys.stderr.close()
+        return 1
+    except OSError as e:
+        print(f"disk_usage: cannot access '{args.root}': {e.strerror}", file=sys.stderr)
+        return 1
+    # Like du: report what could be read, but fail if anything could not
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+expressions.py — Compile arithmetic formulas once, evaluate many times
+
+    >>> f = compile_expression("a*b + c")
+    >>> f(2, 3, 4)
+    10
+    >>> f.evaluate_many({'a': [1, 2], 'b': [3, 4], 'c': [5, 6]})
+    [8, 14]
+
+The formula is parsed with the ast module, checked so that only numbers,
+variable names and arithmetic operators are allowed, constant
+sub-expressions are folded (e.g. "x * (2 + 3)" becomes "x * 5"), and the
+result is turned into real Python bytecode. Evaluation therefore costs
+the same as a hand-written lambda — there is no parsing per row.
+"""
+
+import ast
+import keyword
+import math
+import operator
+
+__all__ = ['compile_expression', 'CompiledExpression']
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Folded integers above this size are left to evaluation time: they
+# would bloat the source, and beyond 4300 digits ast.unparse rejects them
+_MAX_FOLDED_BITS = 4096
+
+
+def _constant(node):
+    """The value of a (possibly negated) number node, or None."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+            and isinstance(node.operand, ast.Constant)):
+        return -node.operand.value
+    return None
+
+
+def _constant_node(value, node):
+    """A node for a folded value. Negative numbers stay USub(Constant):
+    ast.unparse writes a negative Constant without parentheses, which
+    turns (-2) ** x into -2 ** x."""
+    if math.copysign(1, value) < 0:
+        folded = ast.UnaryOp(ast.USub(), ast.Constant(-value))
+    else:
+        folded = ast.Constant(value)
+    return ast.copy_location(folded, node)
+
+
+class _Folder(ast.NodeTransformer):
+    """Validate the tree and fold constant sub-expressions."""
+
+    def __init__(self):
+        self.names = []
+
+    def generic_visit(self, node):
+        if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp,
+                                 ast.Constant, ast.Name, ast.Load,
+                                 *_BINARY_OPS, *_UNARY_OPS)):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+        return node
+
+    def visit_Name(self, node):
+        if node.id not in self.names:
+            self.names.append(node.id)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        left, right = _constant(node.left), _constant(node.right)
+        if left is not None and right is not None:
+            if isinstance(node.op, ast.Pow) and abs(right) > 64:
+                return node         # don't build huge integers at compile time
+            try:
+                value = _BINARY_OPS[type(node.op)](left, right)
+            except (ArithmeticError, ValueError):
+                return node         # leave it for evaluation time, e.g. 1/0
+            if not isinstance(value, (int, float)):
+                return node         # e.g. (-8) ** 0.5 is complex
+            if isinstance(value, int) and value.bit_length() > _MAX_FOLDED_BITS:
+                return node
+            return _constant_node(value, node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        operand = _constant(node.operand)
+        if operand is not None:
+            return _constant_node(_UNARY_OPS[type(node.op)](operand), node)
+        return node
+
+
+class CompiledExpression:
+    """A parsed, folded and compiled arithmetic expression."""
+
+    def __init__(self, text, variables=None):
+        tree = ast.parse(text.strip(), mode='eval')
+        folder = _Folder()
+        tree = ast.fix_missing_locations(folder.visit(tree))
+
+        if variables is None:
+            variables = folder.names
+        else:
+            variables = list(variables)
+            for name in variables:
+                if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+                    raise ValueError(f"Invalid variable name: {name!r}")
+            if len(set(variables)) != len(variables):
+                raise ValueError(f"Duplicate variable names: {variables}")
+            missing = [name for name in folder.names if name not in variables]
+            if missing:
+                raise ValueError(f"Unknown variables in expression: {missing}")
+
+        self.text = text
+        self.variables = tuple(variables)
+        self.source = ast.unparse(tree)
+
+        args = ', '.join(self.variables)
+        namespace = {'__builtins__': {}, 'zip': zip}
+        # _rows takes *columns: zip(*columns) is evaluated in a scope where
+        # no expression variable is bound, so even one named zip is harmless
+        exec(compile(f"def _row({args}):\n    return {self.source}\n"
+                     f"def _rows(*columns):\n"
+                     f"    return [{self.source} for {args + ',' if args else '_'} in zip(*columns)]\n",
+                     f"<expression {text!r}>", 'exec'), namespace)
+        self._row = namespace['_row']
+        self._rows = namespace['_rows']
+
+    def __call__(self, *args, **kwargs):
+        """Evaluate for one row of values, by position or by name."""
+        return self._row(*args, **kwargs)
+
+    def evaluate_many(self, columns):
+        """Evaluate over columns (a mapping of name -> sequence).
+
+        NumPy arrays are passed straight through so the whole column is
+        computed by NumPy; any other sequences are zipped row by row in
+        a single compiled list comprehension.
+        """
+        arrays = [columns[name] for name in self.variables]
+        if arrays and all(hasattr(column, '__array_ufunc__') for column in arrays):
+            return self._row(*arrays)
+        if not self.variables:
+            raise ValueError("Constant expression has no columns to evaluate over")
+        return self._rows(*arrays)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r}, variables={self.variables})"
+
+
+def compile_expression(text, variables=None):
+    """Parse and compile an arithmetic expression.
+
+    variables fixes the positional argument order; by default it is the
+    order in which names first appear in the expression.
+    """
+    return CompiledExpression(text, variables)
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import random
+    import time
+
+    expr = compile_expression("price * qty * (1 - 5 / 100) + 2 ** 3")
+    print(f"Folded: {expr.source}")
+
+    # Folding must not change the meaning, e.g. through lost parentheses
+    for text in ["(-2) ** x", "(0-2) ** x", "(-2.5) ** x", "-2 ** x", "(0.0 * -1) ** x",
+                 "-(-3) * x", "x - -(4 - 6)", "(1 - 3) ** (x + 1)", "2 ** -x", "(-8) ** 0.5 * x"]:
+        for x in (2, 3):
+            assert compile_expression(text)(x) == eval(text, {}, {'x': x}), (text, x)
+
+    N = 1_000_000
+    columns = {'price': [random.random() * 100 for _ in range(N)],
+               'qty': [random.randint(1, 10) for _ in range(N)]}
+
+    start = time.perf_counter()
+    naive = [eval("price * qty * (1 - 5 / 100) + 2 ** 3", {}, {'price': p, 'qty': q})
+             for p, q in zip(columns['price'][:10_000], columns['qty'][:10_000])]
+    eval_rate = 10_000 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    result = expr.evaluate_many(columns)
+    compiled_rate = N / (time.perf_counter() - start)
+
+    print(f"eval() per row : {eval_rate:>14,.0f} rows/s")
+    print(f"evaluate_many  : {compiled_rate:>14,.0f} rows/s")
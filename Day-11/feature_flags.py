@@ -0,0 +1,398 @@
+"""
+feature_flags.py — Compiled feature flags: targeting and percentage rollouts
+
+config.FEATURES maps flag names to booleans. A FlagEngine accepts the
+same dict, and also flags with targeting rules:
+
+    FEATURES = {
+        'new_ui': True,
+        'beta_features': {
+            'rules': [
+                {'users': ['u-17', 'u-42']},                              # always on
+                {'attribute': 'plan', 'equals': 'enterprise'},
+                {'attribute': 'country', 'in': ['US', 'CA'], 'percentage': 25},
+            ],
+            'percentage': 5,            # everyone else: 5% rollout
+        },
+    }
+
+    engine = FlagEngine(FEATURES)
+    ctx = Context('u-99', country='US', plan='free')
+    engine.is_enabled('beta_features', ctx)
+    engine.evaluate_all(ctx)            # {'new_ui': True, 'beta_features': False}
+
+Rules are tried in order and the first whose conditions all match
+decides (its percentage, if any, is a rollout among matching users).
+When no rule matches, the flag's own percentage applies, or its
+default (False). 'enabled': False switches a flag off entirely.
+Conditions: users, and/or attribute with any of equals / not_equals /
+in / not_in / gt / gte / lt / lte; a rule matches only when all of its
+conditions hold ({'attribute': 'age', 'gte': 18, 'lt': 65}).
+
+Definitions are compiled once into closures. Each user is hashed once
+per Context (64-bit BLAKE2b); a flag's rollout bucket is then one
+multiply (mod 2**64) with a per-flag odd multiplier derived from the flag
+name, so buckets are stable across processes and independent between
+flags.
+"""
+
+import hashlib
+import operator
+from collections.abc import Iterable, Mapping, Sequence
+
+__all__ = ['FlagEngine', 'Context', 'FlagDefinitionError']
+
+BUCKETS = 10_000                    # percentages are rounded to two decimal places
+_MASK64 = (1 << 64) - 1
+
+
+class FlagDefinitionError(ValueError):
+    """Raised when a flag definition cannot be compiled."""
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class Context:
+    """The user (and attributes) flags are evaluated for."""
+
+    __slots__ = ('key', 'attributes', 'hash')
+
+    def __init__(self, key, **attributes):
+        self.key = key
+        self.attributes = attributes
+        self.hash = _hash64(str(key))
+
+
+# --- Compilation ---
+
+_COMPARISONS = {
+    'equals': operator.eq, 'not_equals': operator.ne,
+    'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le,
+}
+
+
+# Keys of a rule that describe its outcome rather than a condition
+_OUTCOME_KEYS = {'percentage', 'value'}
+
+
+def _values(name, key, value):
+    """A set of values for 'users' / 'in' / 'not_in'."""
+    if isinstance(value, (str, bytes, Mapping)) or not isinstance(value, Iterable):
+        raise FlagDefinitionError(f"Flag {name!r}: {key!r} must be a list of values")
+    try:
+        return frozenset(value)
+    except TypeError:
+        raise FlagDefinitionError(f"Flag {name!r}: {key!r} values must be hashable") from None
+
+
+def _compile_conditions(name, rule):
+    """A predicate ctx -> bool requiring every condition of the rule."""
+    if not isinstance(rule, Mapping):
+        raise FlagDefinitionError(f"Flag {name!r}: each rule must be a dict")
+    unknown = rule.keys() - _OUTCOME_KEYS - {'users', 'attribute', 'in', 'not_in'} - _COMPARISONS.keys()
+    if unknown:
+        raise FlagDefinitionError(f"Flag {name!r}: unknown rule keys {sorted(unknown)}")
+    conditions = []
+    if 'users' in rule:
+        users = _values(name, 'users', rule['users'])
+        conditions.append(lambda ctx: ctx.key in users)
+    attribute = rule.get('attribute')
+    if attribute is None:
+        if not conditions:
+            raise FlagDefinitionError(f"Flag {name!r}: a rule needs 'users' or 'attribute'")
+        if rule.keys() - _OUTCOME_KEYS - {'users'}:
+            raise FlagDefinitionError(f"Flag {name!r}: rule has operators but no 'attribute'")
+    else:
+        operators = [op_name for op_name in ('in', 'not_in', *_COMPARISONS) if op_name in rule]
+        if not operators:
+            raise FlagDefinitionError(f"Flag {name!r}: rule on {attribute!r} has no operator")
+        conditions.extend(_compile_operator(name, attribute, op_name, rule[op_name]) for op_name in operators)
+
+    if len(conditions) == 1:
+        return conditions[0]
+    conditions = tuple(conditions)
+
+    def every(ctx):
+        for condition in conditions:
+            if not condition(ctx):
+                return False
+        return True
+    return every
+
+
+def _compile_operator(name, attribute, op_name, operand):
+    missing = object()
+
+    if op_name in ('in', 'not_in'):
+        negate = op_name == 'not_in'
+        values = _values(name, op_name, operand)
+
+        def member(ctx):
+            value = ctx.attributes.get(attribute, missing)
+            return value is not missing and (value in values) != negate
+        return member
+
+    op = _COMPARISONS[op_name]
+
+    def compare(ctx):
+        value = ctx.attributes.get(attribute, missing)
+        if value is missing:
+            return False
+        try:
+            return op(value, operand)
+        except TypeError:       # e.g. comparing a str attribute with a number
+            return False
+    return compare
+
+
+def _threshold(name, percentage):
+    """Rollout threshold on the 64-bit scale of _bucket values."""
+    if isinstance(percentage, bool) or not isinstance(percentage, (int, float)):
+        raise FlagDefinitionError(f"Flag {name!r}: percentage must be a number, not {percentage!r}")
+    if not 0 <= percentage <= 100:
+        raise FlagDefinitionError(f"Flag {name!r}: percentage must be between 0 and 100")
+    return (round(percentage * BUCKETS / 100) << 64) // BUCKETS
+
+
+# Thresholds for fixed outcomes: every 64-bit value is below _ALWAYS
+_ALWAYS = 1 << 64
+_NEVER = 0
+
+
+def _outcome(name, spec, fixed_key, fixed_default):
+    if 'percentage' in spec:
+        return _threshold(name, spec['percentage'])
+    return _ALWAYS if spec.get(fixed_key, fixed_default) else _NEVER
+
+
+def _compile_flag(name, definition):
+    """Return True/False for constant flags, else a closure ctx -> bool."""
+    if isinstance(definition, bool):
+        return definition
+    if not isinstance(definition, Mapping):     # frozen ConfigStore values are mappingproxies
+        raise FlagDefinitionError(f"Flag {name!r}: expected a bool or a dict")
+    if not definition.get('enabled', True):
+        return False
+
+    # Every outcome, fixed or a rollout, is "bucket < threshold", where a
+    # user's bucket for this flag is (ctx.hash * multiplier) mod 2**64:
+    # multiply-shift hashing with an odd multiplier derived from the name
+    multiplier = _hash64(f"flag:{name}") | 1
+    rules = definition.get('rules', ())
+    if isinstance(rules, (str, bytes)) or not isinstance(rules, Sequence):     # frozen lists are tuples
+        raise FlagDefinitionError(f"Flag {name!r}: 'rules' must be a list of dicts")
+    rules = tuple((_compile_conditions(name, rule), _outcome(name, rule, 'value', True))
+                  for rule in rules)
+    fallback = _outcome(name, definition, 'default', False)
+
+    if not rules:
+        if fallback in (_ALWAYS, _NEVER):
+            return fallback == _ALWAYS
+        return lambda ctx: (ctx.hash * multiplier) & _MASK64 < fallback
+
+    def evaluate(ctx):
+        for condition, threshold in rules:
+            if condition(ctx):
+                return (ctx.hash * multiplier) & _MASK64 < threshold
+        return (ctx.hash * multiplier) & _MASK64 < fallback
+    return evaluate
+
+
+class _Compiled:
+    """One consistent set of compiled flags, swapped in as a whole."""
+
+    __slots__ = ('constants', 'dynamic', 'all')
+
+    def __init__(self, definitions):
+        if not isinstance(definitions, Mapping):
+            raise FlagDefinitionError(f"Flag definitions must be a dict, not {type(definitions).__name__}")
+        self.constants = {}
+        self.dynamic = {}
+        for name, definition in definitions.items():
+            compiled = _compile_flag(name, definition)
+            if compiled.__class__ is bool:
+                self.constants[name] = compiled
+            else:
+                self.dynamic[name] = compiled
+        self.all = {**self.constants, **self.dynamic}
+
+
+class FlagEngine:
+    """Evaluate compiled feature flags for a Context."""
+
+    def __init__(self, definitions=None):
+        self._compiled = _Compiled(definitions or {})
+
+    def load(self, definitions):
+        """Compile a new set of definitions and switch to it atomically.
+
+        If any definition is invalid, FlagDefinitionError is raised and
+        the current flags stay in use.
+        """
+        self._compiled = _Compiled(definitions)
+
+    def bind(self, store, key='FEATURES'):
+        """Follow a config_store.ConfigStore, recompiling with every snapshot.
+
+        Flags are compiled before the store swaps a snapshot in, so an
+        invalid definition rejects the whole snapshot (check() records
+        the error) and config and flags never disagree.
+        """
+        self.load(store.get(key) or {})
+        pending = {}                    # snapshot version -> compiled flags
+
+        def prepare(snapshot):
+            pending[snapshot.version] = _Compiled(snapshot.get(key) or {})
+
+        def install(old, new):
+            compiled = pending.pop(new.version, None)
+            if compiled is not None:
+                self._compiled = compiled
+
+        store.validate(prepare)
+        store.subscribe(install)
+
+    @property
+    def names(self):
+        return list(self._compiled.all)
+
+    def is_enabled(self, name, ctx=None, default=False):
+        compiled = self._compiled.all.get(name)
+        if compiled is None:
+            return default
+        if compiled.__class__ is bool:
+            return compiled
+        if ctx is None:
+            raise ValueError(f"Flag {name!r} has rules; a Context is required")
+        return compiled(ctx)
+
+    def evaluate_all(self, ctx, names=None):
+        """Evaluate many flags for one context in one call; return {name: bool}.
+
+        With names=None every flag is evaluated.
+        """
+        compiled = self._compiled        # one set of flags for the whole batch
+        if names is None:
+            result = dict(compiled.constants)
+            for name, evaluate in compiled.dynamic.items():
+                result[name] = evaluate(ctx)
+            return result
+        table = compiled.all
+        result = {}
+        for name in names:
+            flag = table.get(name, False)
+            result[name] = flag if flag.__class__ is bool else flag(ctx)
+        return result
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import random
+    import time
+
+    import config
+
+    engine = FlagEngine(config.FEATURES)
+    print(f"config.FEATURES: {engine.evaluate_all(Context('u-1'))}")
+
+    # A realistic mix: mostly constant flags, plus rollouts and targeting
+    rng = random.Random(0)
+    definitions = {}
+    for i in range(2000):
+        kind = i % 4
+        if kind == 0:
+            definitions[f"flag_{i}"] = rng.random() < 0.5
+        elif kind == 1:
+            definitions[f"flag_{i}"] = {'percentage': rng.choice([1, 5, 10, 50])}
+        elif kind == 2:
+            definitions[f"flag_{i}"] = {'rules': [{'attribute': 'country', 'in': ['US', 'CA']}],
+                                        'percentage': 10}
+        else:
+            definitions[f"flag_{i}"] = {'rules': [{'users': ['u-1', 'u-2']},
+                                                  {'attribute': 'age', 'gte': 18, 'percentage': 30}]}
+
+    start = time.perf_counter()
+    engine.load(definitions)
+    print(f"Compiled {len(definitions):,} flags in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    contexts = [Context(f"u-{i}", country=rng.choice(['US', 'DE', 'CA']), age=rng.randint(10, 70))
+                for i in range(1000)]
+
+    start = time.perf_counter()
+    for ctx in contexts:
+        engine.evaluate_all(ctx)
+    batch = (time.perf_counter() - start) / len(contexts)
+    print(f"evaluate_all: {batch * 1e6:.0f} µs per context "
+          f"({batch / len(definitions) * 1e9:.0f} ns per flag)")
+
+    start = time.perf_counter()
+    n = 0
+    for ctx in contexts:
+        for name in ('flag_1', 'flag_2', 'flag_3'):
+            engine.is_enabled(name, ctx)
+            n += 1
+    print(f"is_enabled  : {(time.perf_counter() - start) / n * 1e9:.0f} ns per call")
+
+    start = time.perf_counter()
+    n = 10_000
+    for i in range(n):
+        Context(f"user-{i}", country='US')
+    print(f"Context()   : {(time.perf_counter() - start) / n * 1e9:.0f} ns (hashes the user once)")
+
+    # Rollouts hit their percentage and are independent between flags
+    engine.load({'a': {'percentage': 10}, 'b': {'percentage': 10}})
+    users = [Context(f"user-{i}") for i in range(100_000)]
+    a = [engine.is_enabled('a', ctx) for ctx in users]
+    b = [engine.is_enabled('b', ctx) for ctx in users]
+    both = sum(x and y for x, y in zip(a, b))
+    print(f"10% rollouts: a={sum(a) / len(users):.2%}, b={sum(b) / len(users):.2%}, "
+          f"both={both / len(users):.2%} (independent: ~1.00%)")
+
+    # Malformed definitions are rejected with FlagDefinitionError, never
+    # another exception that would escape ConfigStore.check()
+    bad_definitions = [
+        {'percentage': '10'}, {'percentage': True}, {'rules': [{'users': 5}]},
+        {'rules': [{'users': 'u-1'}]}, {'rules': ['not a rule']}, {'rules': {'users': ['u-1']}},
+        {'rules': [{'attribute': 'country', 'in': 'US'}]}, {'rules': [{'attribute': 'x', 'in': [[1]]}]},
+    ]
+    for definition in bad_definitions:
+        try:
+            FlagEngine({'bad': definition})
+        except FlagDefinitionError:
+            continue
+        raise AssertionError(f"accepted {definition!r}")
+
+    # Through ConfigStore: a bad definition keeps the old snapshot and
+    # flags, the polling thread keeps running, and a fix is picked up
+    import json
+    import os
+    import tempfile
+
+    from config_store import ConfigStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.json')
+
+        def write(features, version):
+            with open(path, 'w') as f:
+                json.dump({'FEATURES': features}, f)
+            os.utime(path, ns=(version * 10**9, version * 10**9))     # a distinct, non-racy mtime
+
+        write({'beta': True}, 1)
+        store = ConfigStore({}, path, environ={})
+        engine = FlagEngine()
+        engine.bind(store)
+        store.start(interval=0.02)
+        write({'beta': {'percentage': '50'}}, 2)
+        time.sleep(0.2)
+        assert isinstance(store.last_error, FlagDefinitionError), store.last_error
+        assert store.snapshot().version == 1 and engine.is_enabled('beta')
+        assert store._thread.is_alive()
+        write({'beta': False}, 3)
+        time.sleep(0.2)
+        assert store.snapshot().version == 2 and not engine.is_enabled('beta')
+        assert store.last_error is None
+        store.stop()
+    print("Malformed definitions rejected; config store kept its snapshot and kept polling")
@@ -0,0 +1,179 @@
+"""
+file_cache.py — Parse a file once, re-parse only when it changes
+
+utils.load_json() and Day-10's load_config() open and parse the file on
+every call. A FileCache wraps such a loader and keeps the parsed result,
+keyed on the path and validated with a single os.stat() per call: the
+file is only read again when its mtime_ns, size or inode changed.
+
+    from file_cache import load_json, load_config
+
+    settings = load_json("settings.json")      # parsed on the first call
+    settings = load_json("settings.json")      # stat() only, same object
+    load_json.cache_info()   # CacheInfo(hits=1, misses=1, evictions=0, currsize=1, maxsize=128)
+
+Cached values are shared between callers, so by default they are
+returned frozen: dicts become read-only mappingproxy views and lists
+become tuples. thaw() gives back a plain, modifiable copy:
+
+    config = thaw(load_config())
+    config["theme"] = "light"
+    utils.save_json(config, "config.json")
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+
+import utils
+
+__all__ = ['FileCache', 'CacheInfo', 'freeze', 'thaw', 'load_json', 'load_config', 'DEFAULT_CONFIG']
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions currsize maxsize')
+
+# A file modified this recently may change again within the same mtime
+# tick without its stat changing (timestamps are 2 s on FAT, 1 s on
+# some network filesystems), so its parse is not kept
+_RACY_NS = 2_000_000_000
+
+
+def freeze(value):
+    """Read-only copy of parsed JSON: dicts -> mappingproxy, lists -> tuple."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Modifiable deep copy of a frozen value (mappings -> dict, tuples -> list)."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class FileCache:
+    """LRU cache of loader(path) results, invalidated when the file changes."""
+
+    def __init__(self, loader, maxsize=128, readonly=True):
+        self.loader = loader
+        self.maxsize = maxsize
+        self.readonly = readonly
+        self._entries = OrderedDict()       # path -> (signature, value)
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __call__(self, path):
+        path = os.fspath(path)
+        signature = _signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        # Parse outside the lock so one slow file does not block hits on others
+        value = self.loader(path)
+        if self.readonly:
+            value = freeze(value)
+        if signature == _signature(path) and time.time_ns() - signature[0] >= _RACY_NS:
+            self._store(path, signature, value)
+        return value
+
+    def _store(self, path, signature, value):
+        with self._lock:
+            self._entries[path] = (signature, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, path):
+        with self._lock:
+            self._entries.pop(os.fspath(path), None)
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             len(self._entries), self.maxsize)
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+load_json = FileCache(utils.load_json)
+
+
+# Day-10's DEFAULT_CONFIG (Day-10/main.py is a script and cannot be imported)
+DEFAULT_CONFIG = {
+    "theme": "dark",
+    "language": "en",
+    "max_connections": 10,
+    "debug": False
+}
+
+
+def load_config(path="config.json", defaults=None):
+    """Cached counterpart of Day-10's load_config().
+
+    A missing file is created from defaults (DEFAULT_CONFIG when not
+    given), as in Day-10.
+    """
+    try:
+        return load_json(path)
+    except FileNotFoundError:
+        defaults = dict(DEFAULT_CONFIG if defaults is None else defaults)
+        utils.save_json(defaults, path)
+        return freeze(defaults)
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+    import timeit
+    from concurrent.futures import ThreadPoolExecutor
+
+    defaults = {**DEFAULT_CONFIG, "features": {f"flag_{i}": i % 2 == 0 for i in range(200)}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.json')
+        load_config(path, defaults)
+        # Backdate the file so it is not "racy" and can be cached at once
+        os.utime(path, ns=(time.time_ns() - 10**10,) * 2)
+
+        n = 20_000
+        uncached = timeit.timeit(lambda: utils.load_json(path), number=n) / n * 1e6
+        cached = timeit.timeit(lambda: load_config(path), number=n) / n * 1e6
+        print(f"utils.load_json : {uncached:7.1f} µs per call")
+        print(f"load_config     : {cached:7.1f} µs per call (cached)")
+
+        # Requests from many threads at once
+        with ThreadPoolExecutor(8) as pool:
+            themes = set(pool.map(lambda _: load_config(path)['theme'], range(10_000)))
+        print(f"Threads saw themes {themes}; {load_json.cache_info()}")
+
+        # A change on disk is picked up by the next call
+        config = thaw(load_config(path))
+        config['theme'] = 'light'
+        utils.save_json(config, path)
+        os.utime(path, ns=(time.time_ns() - 5 * 10**9,) * 2)
+        print(f"After saving: theme={load_config(path)['theme']}; {load_json.cache_info()}")
+
+        try:
+            load_config(path)['theme'] = 'blue'
+        except TypeError as e:
+            print(f"Cached values are read-only: {e}")
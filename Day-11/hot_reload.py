@@ -0,0 +1,248 @@
+"""
+hot_reload.py — Reload changed modules and everything that imports them
+
+importlib.reload(module) re-runs a single module, but modules that did
+"from math_utils import Calculator" keep the old class. ReloadManager
+tracks the import graph of a project's modules (those whose files live
+under a root directory), polls their mtimes, and on a change reloads the
+changed module plus all of its dependents in topological order (modules
+in an import cycle are reloaded together, in the order they originally
+finished importing):
+
+    manager = ReloadManager(Path(__file__).parent)
+    manager.start(interval=0.5)        # background polling thread
+    ...
+    report = manager.reload_changed()  # or poll by hand
+    print(report)                      # Reloaded 3 modules in 1.42 ms: ...
+"""
+
+import ast
+import importlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+
+__all__ = ['ReloadManager', 'ReloadReport']
+
+
+@dataclass
+class ReloadReport:
+    """What a reload pass did and how long it took."""
+    changed: list = field(default_factory=list)
+    reloaded: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def __str__(self):
+        text = (f"Reloaded {len(self.reloaded)} modules in {self.seconds * 1000:.2f} ms: "
+                f"{', '.join(self.reloaded) or '-'}")
+        for name, error in self.errors.items():
+            text += f"\n  {name} failed: {error!r}"
+        return text
+
+
+class ReloadManager:
+    """Dependency-aware reloader for modules under one directory."""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._lock = threading.Lock()
+        self._mtimes = {}           # module name -> st_mtime_ns
+        self._imports = {}          # module name -> set of project modules it imports
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_error = None
+        self.scan()
+
+    # --- Discovery ---
+    def _project_modules(self):
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, '__file__', None)
+            if not filename or not filename.endswith('.py'):
+                continue
+            path = Path(filename).resolve()
+            if path.is_relative_to(self.root):
+                modules[name] = path
+        return modules
+
+    def scan(self):
+        """Rebuild the import graph and mtime table from sys.modules."""
+        with self._lock:
+            modules = self._project_modules()
+            self._mtimes = {name: os.stat(path).st_mtime_ns for name, path in modules.items()}
+            self._imports = {name: _imported_modules(name, path, modules)
+                             for name, path in modules.items()}
+
+    def dependents(self, name):
+        """All project modules that import name, directly or indirectly."""
+        reverse = {}
+        for module, imports in self._imports.items():
+            for imported in imports:
+                reverse.setdefault(imported, set()).add(module)
+        found = set()
+        stack = [name]
+        while stack:
+            for module in reverse.get(stack.pop(), ()):
+                if module not in found:
+                    found.add(module)
+                    stack.append(module)
+        return found
+
+    # --- Change detection ---
+    def changed(self):
+        """Names of tracked modules whose file mtime has changed."""
+        result = []
+        for name, mtime in self._mtimes.items():
+            module = sys.modules.get(name)
+            try:
+                current = os.stat(module.__file__).st_mtime_ns
+            except (AttributeError, OSError):
+                continue
+            if current != mtime:
+                result.append(name)
+        return result
+
+    def reload_changed(self):
+        """Reload changed modules and their dependents; return a ReloadReport."""
+        with self._lock:
+            start = time.perf_counter()
+            report = ReloadReport(changed=self.changed())
+            if not report.changed:
+                return report
+
+            affected = set(report.changed)
+            for name in report.changed:
+                affected |= self.dependents(name)
+
+            # Imported modules come before the modules that import them
+            graph = {name: self._imports.get(name, set()) & affected for name in affected}
+            failed = set()
+            for name in _reload_order(graph, list(self._mtimes)):
+                if graph[name] & failed:
+                    failed.add(name)
+                    continue
+                try:
+                    importlib.reload(sys.modules[name])
+                except Exception as error:
+                    report.errors[name] = error
+                    failed.add(name)
+                else:
+                    report.reloaded.append(name)
+            report.seconds = time.perf_counter() - start
+
+        # Reloaded modules may import new project modules; refresh the graph
+        self.scan()
+        return report
+
+    # --- Background polling ---
+    def start(self, interval=1.0, callback=print):
+        """Poll for changes every interval seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                # One failed pass (e.g. a file deleted mid-scan) must not end polling
+                try:
+                    report = self.reload_changed()
+                except Exception as error:
+                    self.last_error = error
+                    continue
+                self.last_error = None
+                if report.changed:
+                    callback(report)
+
+        self._thread = threading.Thread(target=run, name='hot-reload', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+def _reload_order(graph, discovered):
+    """Names in graph, dependencies first.
+
+    Modules in an import cycle (often a function-level import that breaks
+    the cycle at runtime) have no topological order; each cycle is merged
+    into one group and reloaded in discovery order (sys.modules order,
+    which is the order the modules originally finished importing).
+    """
+    group = {name: name for name in graph}
+    while True:
+        groups = {}
+        for name, imports in graph.items():
+            groups.setdefault(group[name], set()).update(group[imported] for imported in imports)
+        for leader, imports in groups.items():
+            imports.discard(leader)
+        try:
+            leaders = list(TopologicalSorter(groups).static_order())
+            break
+        except CycleError as error:
+            cycle = set(error.args[1])
+            leader = error.args[1][0]
+            for name in graph:
+                if group[name] in cycle:
+                    group[name] = leader
+
+    rank = {name: i for i, name in enumerate(discovered)}
+    members = {}
+    for name in sorted(graph, key=lambda name: rank.get(name, len(rank))):
+        members.setdefault(group[name], []).append(name)
+    return [name for leader in leaders for name in members[leader]]
+
+
+def _imported_modules(name, path, project):
+    """Project modules imported anywhere in the source of one module."""
+    try:
+        tree = ast.parse(path.read_bytes(), str(path))
+    except (OSError, SyntaxError):
+        return set()
+
+    package = name if path.name == '__init__.py' else name.rpartition('.')[0]
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split('.')
+                found.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.rsplit('.', node.level - 1)[0] if node.level > 1 else package
+                base = f"{base}.{node.module}" if node.module else base
+            else:
+                base = node.module
+            found.add(base)
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    found.discard(name)
+    return found & project.keys()
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "prices.py").write_text("RATE = 1.0\n")
+        (root / "cart.py").write_text("from prices import RATE\ndef total(x): return x * RATE\n")
+        (root / "report.py").write_text("import cart\ndef show(): return cart.total(100)\n")
+        sys.path.insert(0, tmp)
+
+        import report
+        manager = ReloadManager(root)
+        print(f"Before: report.show() = {report.show()}")
+
+        (root / "prices.py").write_text("RATE = 1.2\n")
+        os.utime(root / "prices.py", ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        print(manager.reload_changed())
+        print(f"After : report.show() = {report.show()}")
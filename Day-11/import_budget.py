@@ -0,0 +1,55 @@
+"""
+import_budget.py — Fail if a cold "import mypackage" gets too slow
+
+Runs a fresh interpreter with -X importtime, sums the cumulative time
+reported for the package, and exits with status 1 when the median of
+several runs exceeds the budget.
+
+    python import_budget.py                   # mypackage, 5 ms budget
+    python import_budget.py mypackage 2.5     # custom budget (ms)
+"""
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def cold_import_us(module, cwd=HERE):
+    """Cumulative import time of module (in microseconds) in a new process."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            return int(cumulative)
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main(argv):
+    module = argv[1] if len(argv) > 1 else 'mypackage'
+    budget_ms = float(argv[2]) if len(argv) > 2 else 5.0
+    runs = 7
+
+    cold_import_us(module)      # warm the __pycache__ so we time imports, not compiles
+    samples = [cold_import_us(module) / 1000 for _ in range(runs)]
+    median = statistics.median(samples)
+
+    print(f"import {module}: median {median:.2f} ms over {runs} runs "
+          f"(min {min(samples):.2f}, max {max(samples):.2f}), budget {budget_ms:.2f} ms")
+    if median > budget_ms:
+        print("FAIL: cold import is over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
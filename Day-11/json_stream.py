@@ -0,0 +1,185 @@
+"""
+json_stream.py — Read huge JSON arrays one element at a time
+
+utils.load_json() parses the whole document, so a multi-GB array of
+records needs many times its size in memory. iter_json_array() reads
+the file through a small buffer and yields the top-level elements one
+by one; memory stays bounded by the largest single element.
+
+    for record in iter_json_array("events.json"):
+        handle(record)
+
+With with_offsets=True each element comes with the byte offset where it
+starts, so a reader can checkpoint and resume after a restart:
+
+    for offset, record in iter_json_array("events.json", with_offsets=True):
+        save_checkpoint(offset)             # record is not handled yet
+        handle(record)
+
+    for record in iter_json_array("events.json", start=load_checkpoint()):
+        ...                                 # continues at that record
+"""
+
+import codecs
+import json
+import re
+
+__all__ = ['iter_json_array']
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_array(path, start=None, with_offsets=False, chunk_size=1 << 16):
+    """Yield the elements of the top-level JSON array stored in path.
+
+    start is a byte offset previously reported with with_offsets=True;
+    parsing then continues at that element instead of at the "[".
+    Raises json.JSONDecodeError for malformed or truncated input.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'rb') as f:
+        if start is None:
+            if f.read(3) != codecs.BOM_UTF8:
+                f.seek(0)
+        else:
+            f.seek(start)
+        reader = _Buffer(f, chunk_size)
+        yield from _elements(reader, decoder, start is None, with_offsets)
+
+
+class _Buffer:
+    """Decoded text window over a binary file, with byte-offset tracking."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        # Byte offset (in the file) of self.text[self.mark]
+        self.mark = 0
+        self.mark_bytes = f.tell()
+
+    def byte_offset(self, index):
+        """File offset of text[index]; index must not move backwards."""
+        self.mark_bytes += len(self.text[self.mark:index].encode('utf-8'))
+        self.mark = index
+        return self.mark_bytes
+
+    def fill(self, size=None):
+        """Drop consumed text and append the next chunk of the file."""
+        self.byte_offset(self.pos)
+        self.text = self.text[self.pos:]
+        self.pos = self.mark = 0
+        data = self.f.read(size or self.chunk_size)
+        if data:
+            self.text += self.decoder.decode(data)
+        else:
+            self.text += self.decoder.decode(b'', final=True)
+            self.eof = True
+
+    def skip_whitespace(self, index):
+        return _WHITESPACE.match(self.text, index).end()
+
+
+def _elements(buf, decoder, expect_open, with_offsets):
+    state = 'open' if expect_open else 'element'
+    read_size = buf.chunk_size
+    while True:
+        buf.pos = buf.skip_whitespace(buf.pos)
+        if buf.pos == len(buf.text):
+            if buf.eof:
+                raise json.JSONDecodeError("Unterminated JSON array", buf.text, buf.pos)
+            buf.fill()
+            continue
+
+        char = buf.text[buf.pos]
+        if state == 'open':
+            if char != '[':
+                raise json.JSONDecodeError("Expecting '[' at start of JSON array", buf.text, buf.pos)
+            buf.pos += 1
+            state = 'first'
+            continue
+
+        if state == 'separator':
+            if char == ',':
+                buf.pos += 1
+                state = 'element'
+                continue
+            if char == ']':
+                return
+            raise json.JSONDecodeError("Expecting ',' or ']'", buf.text, buf.pos)
+
+        if state == 'first' and char == ']':
+            return
+
+        try:
+            value, end = decoder.raw_decode(buf.text, buf.pos)
+            after = buf.skip_whitespace(end)
+            # A value near the end of the buffer may be cut short (the
+            # number 12 out of 12345, or 1 out of 1e5), so only accept it
+            # once the following delimiter has been seen.
+            complete = buf.eof or (after < len(buf.text) and buf.text[after] in ',]')
+        except json.JSONDecodeError:
+            if buf.eof:
+                raise
+            complete = False
+        if not complete:
+            # Grow the read size so one huge element is not re-parsed
+            # from scratch once per small chunk
+            buf.fill(read_size)
+            read_size *= 2
+            continue
+
+        read_size = buf.chunk_size
+        if with_offsets:
+            yield buf.byte_offset(buf.pos), value
+        else:
+            yield value
+        buf.pos = after
+        state = 'separator'
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+
+    N = 200_000
+    fd, path = tempfile.mkstemp(suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('[\n')
+            for i in range(N):
+                record = {'id': i, 'name': f"user-{i} ✓", 'tags': ['a', 'b'], 'score': i * 0.5}
+                f.write(('  ' if i == 0 else ', ') + json.dumps(record, ensure_ascii=False) + '\n')
+            f.write(']\n')
+        size = os.path.getsize(path)
+
+        def load_all():
+            with open(path, encoding='utf-8') as f:
+                return len(json.load(f))
+
+        for label, load in [("json.load", load_all),
+                            ("iter_json_array", lambda: sum(1 for _ in iter_json_array(path)))]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = load()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:<16} {count:,} records in {elapsed:.2f}s, "
+                  f"peak {peak / 1024 / 1024:6.1f} MB for a {size / 1024 / 1024:.1f} MB file")
+
+        # Resume from the offset of element 150,000
+        offsets = iter_json_array(path, with_offsets=True)
+        for offset, record in offsets:
+            if record['id'] == 150_000:
+                break
+        resumed = next(iter_json_array(path, start=offset))
+        print(f"Resumed at byte {offset:,}: id={resumed['id']}")
+    finally:
+        os.remove(path)
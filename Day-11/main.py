@@ -6,7 +6,11 @@ Importing · Creating Modules · __name__ == "__main__" · Package Structure
 
 import sys
 import os
-from pathlib import Path
+
+# The example modules in this guide are served from memory instead of being
+# written to disk, so running it never overwrites files in this folder.
+import memory_loader
+memory_loader.install()
 
 # ============================================================================
 # 1. WHAT ARE MODULES?
@@ -148,8 +152,8 @@ if __name__ == "__main__":
     print(f"factorial(5) = {factorial(5)}")
 '''
 
-Path("math_utils.py").write_text(module_content)
-print("\n✓ Created: math_utils.py")
+memory_loader.register("math_utils", module_content)
+print("\n✓ Created: math_utils (in memory)")
 
 # Now import and use it
 print("\n3a. Using our custom module:")
@@ -222,8 +226,8 @@ if __name__ == "__main__":
     main()
 '''
 
-Path("demo.py").write_text(demo_module)
-print("\n✓ Created: demo.py")
+memory_loader.register("demo", demo_module)
+print("\n✓ Created: demo (in memory)")
 
 print("\n4a. When we import demo.py:")
 print("    import demo")
@@ -282,9 +286,6 @@ mypackage/
 print(structure)
 
 # Create a package
-package_dir = Path("mypackage")
-package_dir.mkdir(exist_ok=True)
-
 # Create __init__.py
 init_content = '''"""
 mypackage — A demonstration package
@@ -311,8 +312,8 @@ def package_info():
     return f"{PACKAGE_NAME} v{__version__}"
 '''
 
-(package_dir / "__init__.py").write_text(init_content)
-print("✓ Created: mypackage/__init__.py")
+memory_loader.register("mypackage", init_content, is_package=True)
+print("✓ Created: mypackage/__init__.py (in memory)")
 
 # Create string_utils.py module
 string_utils_content = '''"""
@@ -332,8 +333,8 @@ def count_vowels(text):
     return sum(1 for c in text.lower() if c in 'aeiou')
 '''
 
-(package_dir / "string_utils.py").write_text(string_utils_content)
-print("✓ Created: mypackage/string_utils.py")
+memory_loader.register("mypackage.string_utils", string_utils_content)
+print("✓ Created: mypackage/string_utils.py (in memory)")
 
 # Create number_utils.py module
 number_utils_content = '''"""
@@ -364,8 +365,8 @@ def factorial(n):
     return n * factorial(n - 1)
 '''
 
-(package_dir / "number_utils.py").write_text(number_utils_content)
-print("✓ Created: mypackage/number_utils.py")
+memory_loader.register("mypackage.number_utils", number_utils_content)
+print("✓ Created: mypackage/number_utils.py (in memory)")
 
 
 # ============================================================================
@@ -422,11 +423,9 @@ print("8. SUBPACKAGES")
 print("=" * 70)
 
 # Create a subpackage
-subpackage_dir = package_dir / "math"
-subpackage_dir.mkdir(exist_ok=True)
 
 # Subpackage __init__.py
-(subpackage_dir / "__init__.py").write_text('"""Math utilities subpackage."""\n')
+memory_loader.register("mypackage.math", '"""Math utilities subpackage."""\n', is_package=True)
 
 # geometry.py in subpackage
 geometry_content = '''"""
@@ -448,8 +447,8 @@ def rectangle_area(width, height):
     return width * height
 '''
 
-(subpackage_dir / "geometry.py").write_text(geometry_content)
-print("✓ Created: mypackage/math/geometry.py")
+memory_loader.register("mypackage.math.geometry", geometry_content)
+print("✓ Created: mypackage/math/geometry.py (in memory)")
 
 print("\n8a. Importing from subpackage:")
 print("    from mypackage.math import geometry")
@@ -509,8 +508,8 @@ if __name__ == "__main__":
     run_demo()
 '''
 
-(package_dir / "demo.py").write_text(relative_demo)
-print("✓ Created: mypackage/demo.py (with relative imports)")
+memory_loader.register("mypackage.demo", relative_demo)
+print("✓ Created: mypackage/demo.py (in memory, with relative imports)")
 
 from mypackage.demo import run_demo
 run_demo()
@@ -572,8 +571,8 @@ class _InternalHelper:
     pass
 '''
 
-Path("limited_module.py").write_text(all_demo_module)
-print("✓ Created: limited_module.py")
+memory_loader.register("limited_module", all_demo_module)
+print("✓ Created: limited_module (in memory)")
 
 print("\n10a. Using __all__:")
 print("    from limited_module import *")
@@ -597,7 +596,7 @@ print("\n11a. Special module attributes:")
 import math_utils as mu
 
 print(f"    __name__:     {mu.__name__}")
-print(f"    __file__:     {mu.__file__}")
+print(f"    __spec__.origin: {mu.__spec__.origin}")
 print(f"    __doc__:      {mu.__doc__[:50]}...")
 
 print("\n11b. dir() — list module contents:")
@@ -639,16 +638,16 @@ print("\n12a. Demonstration:")
 import importlib
 
 # Modify the module
-original = Path("math_utils.py").read_text()
+original = module_content
 modified = original.replace("PI = 3.14159", "PI = 3.14159265359")
-Path("math_utils.py").write_text(modified)
+memory_loader.register("math_utils", modified)
 
 # Reload
 importlib.reload(math_utils)
 print(f"    After reload: math_utils.PI = {math_utils.PI}")
 
 # Restore original
-Path("math_utils.py").write_text(original)
+memory_loader.register("math_utils", original)
 
 
 # ============================================================================
@@ -689,8 +688,8 @@ def get_database_url():
     return f"postgresql://{DATABASE['user']}@{DATABASE['host']}:{DATABASE['port']}/{DATABASE['name']}"
 '''
 
-Path("config.py").write_text(config_content)
-print("✓ Created: config.py")
+memory_loader.register("config", config_content)
+print("✓ Created: config (in memory)")
 
 import config
 
@@ -730,8 +729,8 @@ def format_size(bytes):
     return f"{bytes:.2f} TB"
 '''
 
-Path("utils.py").write_text(utils_content)
-print("✓ Created: utils.py")
+memory_loader.register("utils", utils_content)
+print("✓ Created: utils (in memory)")
 
 import utils
 
@@ -851,30 +850,13 @@ print("\n" + "=" * 70)
 print("16. CLEANUP")
 print("=" * 70)
 
-# Clean up created files
-import shutil
-
-cleanup_items = [
-    "math_utils.py",
-    "demo.py",
-    "mypackage",
-    "limited_module.py",
-    "config.py",
-    "utils.py",
-    "__pycache__"
-]
-
-removed = 0
-for item in cleanup_items:
-    path = Path(item)
-    if path.is_dir():
-        shutil.rmtree(path)
-        removed += 1
-    elif path.exists():
-        path.unlink()
-        removed += 1
-
-print(f"\n✓ Cleaned up {removed} files/directories")
+# Nothing was written to disk — just forget the in-memory modules
+removed = len(memory_loader.registered())
+memory_loader.uninstall()
+for name in memory_loader.registered():
+    memory_loader.unregister(name)
+
+print(f"\n✓ Unloaded {removed} in-memory modules")
 
 print("\n" + "=" * 70)
 print("END OF MODULES & PACKAGES GUIDE")
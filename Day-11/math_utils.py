@@ -38,6 +38,12 @@ class Calculator:
     def reset(self):
         self.result = 0
         return self.result
+    
+    @staticmethod
+    def compile(expression, variables=None):
+        """Compile a formula such as "a*b + c" into a fast callable."""
+        from expressions import compile_expression
+        return compile_expression(expression, variables)
 
 # This runs only when module is executed directly
 if __name__ == "__main__":
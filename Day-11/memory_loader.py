@@ -0,0 +1,132 @@
+"""
+memory_loader.py — Import generated modules straight from memory
+
+Instead of writing source to a .py file and importing it, register the
+source and import it as usual:
+
+    import memory_loader
+    memory_loader.install()
+    memory_loader.register("greeting", "def hello(): return 'hi'")
+
+    import greeting
+    greeting.hello()                    # 'hi'
+
+    memory_loader.register("greeting", "def hello(): return 'hello'")
+    importlib.reload(greeting)          # picks up the new source
+
+Nothing touches the disk: no .py files, no __pycache__ entries. Each
+source is compiled once and the code object is cached until the source
+changes, so re-importing or reloading unchanged modules skips compile().
+"""
+
+import importlib.abc
+import importlib.util
+import linecache
+import sys
+
+__all__ = ['register', 'unregister', 'registered', 'install', 'uninstall',
+           'MemoryFinder']
+
+
+class _Entry:
+    """Source and (lazily compiled) code for one registered module."""
+
+    __slots__ = ('source', 'is_package', 'filename', 'code')
+
+    def __init__(self, name, source, is_package):
+        self.source = source
+        self.is_package = is_package
+        self.filename = f"<memory:{name}>"
+        self.code = None
+
+
+class MemoryFinder(importlib.abc.MetaPathFinder, importlib.abc.InspectLoader):
+    """Meta path finder and loader backed by a dict of module sources."""
+
+    def __init__(self):
+        self._modules = {}
+
+    # --- Registry ---
+    def register(self, fullname, source, is_package=False):
+        current = self._modules.get(fullname)
+        if current is not None and current.source == source and current.is_package == is_package:
+            return      # unchanged: keep the compiled code
+        entry = _Entry(fullname, source, is_package)
+        # Make tracebacks and inspect.getsource() work without a file
+        linecache.cache[entry.filename] = (
+            len(source), None, source.splitlines(keepends=True), entry.filename)
+        self._modules[fullname] = entry
+
+    def unregister(self, fullname):
+        entry = self._modules.pop(fullname, None)
+        if entry is not None:
+            linecache.cache.pop(entry.filename, None)
+
+    def registered(self):
+        return sorted(self._modules)
+
+    # --- MetaPathFinder ---
+    def find_spec(self, fullname, path=None, target=None):
+        entry = self._modules.get(fullname)
+        if entry is None:
+            return None
+        # Packages get an empty __path__: their submodules are looked up
+        # by name in this finder, never on disk
+        return importlib.util.spec_from_loader(
+            fullname, self, origin=entry.filename, is_package=entry.is_package)
+
+    # --- Loader ---
+    def is_package(self, fullname):
+        return self._entry(fullname).is_package
+
+    def get_source(self, fullname):
+        return self._entry(fullname).source
+
+    def get_code(self, fullname):
+        entry = self._entry(fullname)
+        if entry.code is None:
+            entry.code = compile(entry.source, entry.filename, 'exec', dont_inherit=True)
+        return entry.code
+
+    def exec_module(self, module):
+        exec(self.get_code(module.__name__), module.__dict__)
+
+    def _entry(self, fullname):
+        try:
+            return self._modules[fullname]
+        except KeyError:
+            raise ImportError(f"No in-memory module named {fullname!r}", name=fullname) from None
+
+
+_finder = MemoryFinder()
+
+
+def install():
+    """Put the in-memory finder first on sys.meta_path (idempotent)."""
+    if _finder not in sys.meta_path:
+        sys.meta_path.insert(0, _finder)
+    return _finder
+
+
+def uninstall(forget_modules=True):
+    """Remove the finder; optionally drop its modules from sys.modules."""
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+    if forget_modules:
+        for name in _finder.registered():
+            sys.modules.pop(name, None)
+
+
+def register(fullname, source, is_package=False):
+    """Register (or replace) the source for a module or package."""
+    _finder.register(fullname, source, is_package)
+
+
+def unregister(fullname):
+    """Forget a registered module's source."""
+    _finder.unregister(fullname)
+
+
+def registered():
+    """Names of all registered modules."""
+    return _finder.registered()
@@ -0,0 +1,360 @@
+"""
+metrics.py — In-process counters and latency histograms
+
+    from metrics import instrument, REGISTRY
+
+    @instrument
+    def handle(request): ...
+
+    instrument_module(utils, ['load_json', 'save_json'])   # wrap existing functions
+    REGISTRY.histogram('function_latency_seconds', function='utils.load_json').percentile(99)
+    REGISTRY.write_prometheus('metrics.prom')             # node_exporter textfile format
+
+Counters and histograms keep one cell per thread, so recording never
+takes a lock; cells are summed when a snapshot is taken. When a thread
+exits its cell is folded into a shared one, so thread-per-request
+servers do not accumulate cells. Histograms use
+HDR-style log buckets: every power of two is split into 16 linear
+sub-buckets, giving percentiles within ~6% of the true value for any
+latency from nanoseconds to hours with a fixed 1024-slot table.
+"""
+
+import functools
+import os
+import re
+import threading
+import time
+import weakref
+
+__all__ = ['Counter', 'Histogram', 'MetricsRegistry', 'REGISTRY',
+           'instrument', 'instrument_module']
+
+SUB_BUCKET_BITS = 5
+_HALF = 1 << (SUB_BUCKET_BITS - 1)      # sub-buckets per power of two
+_SLOTS = 1024
+
+
+def bucket_index(value):
+    """Bucket of a non-negative integer value (nanoseconds)."""
+    if value < 2 * _HALF:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return shift * _HALF + (value >> shift)
+
+
+def bucket_bounds(index):
+    """Inclusive (low, high) range of values that fall in a bucket."""
+    if index < 2 * _HALF:
+        return index, index
+    shift, mantissa = divmod(index, _HALF)
+    shift -= 1
+    mantissa += _HALF
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class _ThreadToken:
+    """Lives in a thread's local storage; collected when the thread exits."""
+
+    __slots__ = ('__weakref__',)
+
+
+class _PerThread:
+    """Base for metrics whose state lives in one cell per thread."""
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self._local = threading.local()
+        self._cells = {}                  # id(cell) -> cell, for live threads
+        self._retired = self._new_cell()  # totals of threads that have exited
+        # Taken when a thread creates or retires its cell and while
+        # summing, never when recording
+        self._lock = threading.Lock()
+
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._new_cell()
+            token = self._local.token = _ThreadToken()
+            weakref.finalize(token, self._retire, cell)
+            with self._lock:
+                self._cells[id(cell)] = cell
+            return cell
+
+    def _retire(self, cell):
+        with self._lock:
+            del self._cells[id(cell)]
+            self._fold(self._retired, cell)
+
+
+class Counter(_PerThread):
+    """Monotonic counter."""
+
+    kind = 'counter'
+
+    def _new_cell(self):
+        return [0]
+
+    @staticmethod
+    def _fold(into, cell):
+        into[0] += cell[0]
+
+    def inc(self, amount=1):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+
+    @property
+    def value(self):
+        with self._lock:
+            return self._retired[0] + sum(cell[0] for cell in self._cells.values())
+
+
+class Histogram(_PerThread):
+    """Log-bucketed histogram of durations, recorded in nanoseconds."""
+
+    kind = 'histogram'
+
+    def _new_cell(self):
+        # [count, sum_ns, bucket counts...]
+        return [0, 0, [0] * _SLOTS]
+
+    @staticmethod
+    def _fold(into, cell):
+        into[0] += cell[0]
+        into[1] += cell[1]
+        buckets = into[2]
+        for i, n in enumerate(cell[2]):
+            if n:
+                buckets[i] += n
+
+    def observe_ns(self, nanoseconds):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += 1
+        cell[1] += nanoseconds
+        # bucket_index(), inlined: this is the hot path
+        if nanoseconds < 2 * _HALF:
+            index = nanoseconds
+        else:
+            shift = nanoseconds.bit_length() - SUB_BUCKET_BITS
+            index = shift * _HALF + (nanoseconds >> shift)
+            if index >= _SLOTS:
+                index = _SLOTS - 1
+        cell[2][index] += 1
+
+    def observe(self, seconds):
+        self.observe_ns(int(seconds * 1e9))
+
+    def snapshot(self):
+        """(count, sum_seconds, merged bucket counts)."""
+        merged = self._new_cell()
+        with self._lock:
+            self._fold(merged, self._retired)
+            for cell in self._cells.values():
+                self._fold(merged, cell)
+        count, total, buckets = merged
+        return count, total / 1e9, buckets
+
+    def percentile(self, p, _snapshot=None):
+        """Approximate p-th percentile in seconds (None if empty)."""
+        count, _, buckets = _snapshot or self.snapshot()
+        if not count:
+            return None
+        rank = max(1, round(p / 100 * count))
+        seen = 0
+        for index, n in enumerate(buckets):
+            seen += n
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return (low + high) / 2 / 1e9
+        return None
+
+
+_NAME_RE = re.compile(r'[^a-zA-Z0-9_:]')
+
+
+def _metric_name(name):
+    return _NAME_RE.sub('_', name)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+        parts.append(f'{_metric_name(key)}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class MetricsRegistry:
+    """Named, labelled counters and histograms."""
+
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, labels)
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {name!r} is a {metric.kind}, not a {cls.kind}")
+        return metric
+
+    def counter(self, name, **labels):
+        return self._get(Counter, name, labels)
+
+    def histogram(self, name, **labels):
+        return self._get(Histogram, name, labels)
+
+    def snapshot(self):
+        """Plain-dict view of every metric, e.g. for JSON or logging."""
+        result = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            entry = {'name': metric.name, 'labels': dict(metric.labels), 'type': metric.kind}
+            if metric.kind == 'counter':
+                entry['value'] = metric.value
+            else:
+                snap = metric.snapshot()
+                entry['count'], entry['sum'] = snap[0], snap[1]
+                entry['quantiles'] = {q: metric.percentile(q * 100, snap) for q in self.QUANTILES}
+            result.append(entry)
+        return result
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (histograms as summaries)."""
+        lines = []
+        typed = set()
+        for entry in sorted(self.snapshot(), key=lambda e: (e['name'], sorted(e['labels'].items()))):
+            name = _metric_name(entry['name'])
+            if entry['type'] == 'counter':
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_label_text(entry['labels'])} {entry['value']}")
+                continue
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q, value in entry['quantiles'].items():
+                if value is not None:
+                    labels = dict(entry['labels'], quantile=q)
+                    lines.append(f"{name}{_label_text(labels)} {value:.9g}")
+            lines.append(f"{name}_sum{_label_text(entry['labels'])} {entry['sum']:.9g}")
+            lines.append(f"{name}_count{_label_text(entry['labels'])} {entry['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the exposition atomically (safe for textfile collectors)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def instrument(func=None, *, name=None, registry=None):
+    """Record latency (and so call count) and errors of func.
+
+    Metrics are labelled function="<module>.<qualname>"; the call count
+    is the latency histogram's count (function_latency_seconds_count).
+    """
+    if func is None:
+        return functools.partial(instrument, name=name, registry=registry)
+
+    registry = registry or REGISTRY
+    label = name or f"{func.__module__}.{func.__qualname__}"
+    errors = registry.counter('function_errors_total', function=label)
+    latency = registry.histogram('function_latency_seconds', function=label)
+    observe = latency.observe_ns
+    clock = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            errors.inc()
+            raise
+        finally:
+            observe(clock() - start)
+
+    wrapper.__wrapped_metrics__ = (errors, latency)
+    return wrapper
+
+
+def instrument_module(module, names=None, registry=None):
+    """Replace functions of a module with instrumented wrappers, in place.
+
+    names defaults to the module's __all__, or its public functions.
+    Code that already holds a reference to the original function (e.g.
+    after "from module import f") keeps calling the uninstrumented one.
+    """
+    if names is None:
+        names = getattr(module, '__all__', None) or [
+            n for n, obj in vars(module).items()
+            if not n.startswith('_') and callable(obj) and getattr(obj, '__module__', None) == module.__name__
+        ]
+    wrapped = []
+    for attr in names:
+        func = getattr(module, attr)
+        if not callable(func) or isinstance(func, type) or hasattr(func, '__wrapped_metrics__'):
+            continue
+        setattr(module, attr, instrument(func, name=f"{module.__name__}.{attr}", registry=registry))
+        wrapped.append(attr)
+    return wrapped
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+    import timeit
+
+    import utils
+    from mypackage import number_utils
+
+    instrument_module(utils, ['load_json', 'save_json'])
+    instrument_module(number_utils)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.json')
+        for i in range(200):
+            utils.save_json({'i': i, 'items': list(range(100))}, path)
+            utils.load_json(path)
+        for n in range(20_000):
+            number_utils.is_prime(n)
+
+        prom = os.path.join(tmp, 'metrics.prom')
+        REGISTRY.write_prometheus(prom)
+        with open(prom) as f:
+            text = f.read()
+    print('\n'.join(line for line in text.splitlines() if 'is_prime' in line or 'load_json' in line))
+
+    # Instrumentation overhead on a trivial function
+    def noop():
+        pass
+
+    registry = MetricsRegistry()
+    wrapped = instrument(noop, registry=registry)
+    n = 1_000_000
+    raw = timeit.timeit(noop, number=n) / n * 1e9
+    inst = timeit.timeit(wrapped, number=n) / n * 1e9
+    print(f"\nOverhead per call: {inst - raw:.0f} ns ({raw:.0f} ns raw, {inst:.0f} ns instrumented)")
@@ -3,14 +3,26 @@ mypackage — A demonstration package
 
 This __init__.py file makes mypackage a package.
 You can also use it to control what gets imported.
+
+Submodules are loaded lazily (PEP 562): "import mypackage" only runs
+this file, and string_utils / number_utils are imported the first time
+one of their names is used.
 """
 
+import importlib
+
 # Package version
 __version__ = "1.0.0"
 
-# Import commonly used items to package level
-from .string_utils import reverse_string, capitalize_words
-from .number_utils import is_even, is_prime
+# Commonly used items, available at package level on first access
+_LAZY_ATTRS = {
+    'reverse_string': 'string_utils',
+    'capitalize_words': 'string_utils',
+    'is_even': 'number_utils',
+    'is_prime': 'number_utils',
+}
+
+_SUBMODULES = {'string_utils', 'number_utils', 'math', 'demo', 'batch', 'profiling'}
 
 # Define __all__ for "from mypackage import *"
 __all__ = ['reverse_string', 'capitalize_words', 'is_even', 'is_prime']
@@ -21,3 +33,18 @@ PACKAGE_NAME = "mypackage"
 def package_info():
     """Get package information."""
     return f"{PACKAGE_NAME} v{__version__}"
+
+def __getattr__(name):
+    """Import submodules and their exported names on first use."""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value     # cache: later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _SUBMODULES)
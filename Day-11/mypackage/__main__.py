@@ -0,0 +1,93 @@
+"""
+python -m mypackage — Bulk operations for shell pipelines
+
+Reads newline-delimited input from files (or stdin), processes it in
+chunks with the batch kernels, and writes buffered output:
+
+    seq 1 1000000 | python -m mypackage primes > primes.txt
+    python -m mypackage reverse words.txt --workers 4 --chunk-size 50000
+"""
+
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .batch import KERNELS
+
+
+def _lines(paths):
+    """Input lines without trailing newlines, from each path or stdin."""
+    for path in paths or ['-']:
+        if path == '-':
+            stream = sys.stdin
+            yield from (line.rstrip('\r\n') for line in stream)
+        else:
+            with open(path, encoding='utf-8') as stream:
+                yield from (line.rstrip('\r\n') for line in stream)
+
+
+def _chunks(lines, size):
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _results(kernel, chunks, workers):
+    """Kernel output per chunk, in input order."""
+    if workers <= 1:
+        yield from map(kernel, chunks)
+        return
+    # Keep a bounded number of chunks in flight so input is streamed,
+    # not read into memory all at once
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(kernel, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m mypackage', description="Bulk operations for shell pipelines")
+    parser.add_argument('command', choices=sorted(KERNELS), help="operation to apply to every line")
+    parser.add_argument('files', nargs='*', help="input files (default: stdin; '-' also means stdin)")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="worker processes (default: 1, no pool)")
+    parser.add_argument('--chunk-size', type=int, default=10_000, metavar='LINES',
+                        help="lines per batch (default: 10000)")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    kernel = KERNELS[args.command]
+    chunks = _chunks(_lines(args.files), args.chunk_size)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', buffering=1 << 20)
+    try:
+        for result in _results(kernel, chunks, args.workers):
+            if result:
+                out.write('\n'.join(result))
+                out.write('\n')
+    except ValueError as error:
+        parser.exit(1, f"{parser.prog} {args.command}: error: {error}\n")
+    except BrokenPipeError:
+        sys.stderr.close()      # e.g. "| head": stop quietly
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
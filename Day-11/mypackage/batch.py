@@ -0,0 +1,134 @@
+"""
+batch.py — Batch kernels behind "python -m mypackage"
+
+Each kernel takes a list of input lines (without newlines) and returns
+one output string per line, so a whole chunk is handled by a single call
+(and can be shipped to a worker process as one task). Blank lines give
+blank output lines, so output stays aligned with input; primes, a filter,
+drops them.
+"""
+
+import math
+import sys
+
+from .string_utils import reverse_string
+
+
+_sieve_cache = bytearray()
+
+
+def _sieve(limit):
+    """bytearray where flags[n] == 1 iff n is prime, for 0 <= n <= limit.
+
+    The largest sieve built so far is kept, so later chunks in the same
+    process usually reuse it.
+    """
+    global _sieve_cache
+    if len(_sieve_cache) > limit:
+        return _sieve_cache
+    limit = max(limit, 2 * (len(_sieve_cache) - 1), 1)
+    flags = bytearray([1]) * (limit + 1)
+    flags[0] = flags[1] = 0
+    for i in range(2, math.isqrt(limit) + 1):
+        if flags[i]:
+            flags[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    _sieve_cache = flags
+    return flags
+
+
+# Miller-Rabin with these bases is exact for n < 3.3 * 10**24; above
+# that it is a strong probable-prime test
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _is_prime(n):
+    """Miller-Rabin primality test: a few modular exponentiations per number."""
+    if n < 2:
+        return False
+    for p in _WITNESSES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+# Largest value looked up in the shared sieve; larger ones use Miller-Rabin
+SIEVE_LIMIT = 10_000_000
+
+
+def primes(lines):
+    """Keep only the lines holding a prime number."""
+    numbers = [int(line) for line in lines if line.strip()]
+    small = [n for n in numbers if n <= SIEVE_LIMIT]
+    flags = _sieve(max(small)) if small else None
+    return [str(n) for n in numbers
+            if n > 1 and (flags[n] if n <= SIEVE_LIMIT else _is_prime(n))]
+
+
+def factorial(lines):
+    """n! for each line (math.factorial: C speed, no recursion limit)."""
+    # n! has more than 4300 digits from n = 1751 on: lift the int -> str
+    # conversion limit (Python 3.11+) while formatting
+    limit = sys.get_int_max_str_digits() if hasattr(sys, 'get_int_max_str_digits') else None
+    if limit is not None:
+        sys.set_int_max_str_digits(0)
+    try:
+        return [str(math.factorial(int(line))) if line.strip() else '' for line in lines]
+    finally:
+        if limit is not None:
+            sys.set_int_max_str_digits(limit)
+
+
+def reverse(lines):
+    """Each line reversed."""
+    return list(map(reverse_string, lines))
+
+
+def vowels(lines):
+    """Number of vowels in each line."""
+    result = []
+    for line in lines:
+        lower = line.lower()
+        result.append(str(lower.count('a') + lower.count('e') + lower.count('i')
+                          + lower.count('o') + lower.count('u')))
+    return result
+
+
+def area(lines):
+    """Circle area for "r" lines, rectangle area for "w h" lines."""
+    pi = math.pi
+    result = []
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            result.append('')
+        elif len(fields) == 1:
+            r = float(fields[0])
+            result.append(repr(pi * r * r))
+        elif len(fields) == 2:
+            result.append(repr(float(fields[0]) * float(fields[1])))
+        else:
+            raise ValueError(f"area expects 'radius' or 'width height', got {line!r}")
+    return result
+
+
+KERNELS = {
+    'primes': primes,
+    'factorial': factorial,
+    'reverse': reverse,
+    'vowels': vowels,
+    'area': area,
+}
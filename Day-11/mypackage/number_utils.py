@@ -2,6 +2,8 @@
 number_utils.py — Number manipulation utilities
 """
 
+from .profiling import profiled
+
 def is_even(n):
     """Check if number is even."""
     return n % 2 == 0
@@ -10,6 +12,7 @@ def is_odd(n):
     """Check if number is odd."""
     return n % 2 != 0
 
+@profiled
 def is_prime(n):
     """Check if number is prime."""
     if n < 2:
@@ -0,0 +1,290 @@
+"""
+profiling.py — Switchable profiling for package hot paths
+
+Decorate a function with @profiled. It is left completely untouched
+(zero overhead) unless its name is listed in an environment variable:
+
+    MYPACKAGE_PROFILE=is_prime,capitalize_words python app.py
+    MYPACKAGE_PROFILE='*' python app.py                 # every @profiled function
+
+MYPACKAGE_PROFILE_MODE selects the profiler:
+    cprofile (default)  deterministic cProfile; writes a .pstats file
+    sample              a background thread samples the stacks of threads
+                        inside profiled functions every 5 ms (much lower
+                        overhead); writes a .collapsed file
+
+Results are written at exit to MYPACKAGE_PROFILE_DIR (default: current
+directory) as profile-<pid>.pstats / profile-<pid>.collapsed. Collapsed
+stacks are the input format of flamegraph.pl and speedscope.
+
+The same profilers can be used directly:
+
+    with profile_block():           # honours MYPACKAGE_PROFILE_MODE
+        run_workload()
+"""
+
+import atexit
+import functools
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+__all__ = ['profiled', 'profile_block', 'is_enabled', 'StackSampler', 'dump']
+
+ENV_FUNCTIONS = 'MYPACKAGE_PROFILE'
+ENV_MODE = 'MYPACKAGE_PROFILE_MODE'
+ENV_DIR = 'MYPACKAGE_PROFILE_DIR'
+
+
+def _enabled_names():
+    value = os.environ.get(ENV_FUNCTIONS, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def is_enabled(name):
+    """True if profiling is switched on for a function name."""
+    names = _enabled_names()
+    return '*' in names or name in names or name.rpartition('.')[2] in names
+
+
+def _mode():
+    return os.environ.get(ENV_MODE, 'cprofile').lower()
+
+
+# --- Deterministic profiling (cProfile) ---
+
+class _CProfileState:
+    """cProfile for @profiled code in every thread.
+
+    From Python 3.12 cProfile is built on sys.monitoring: only one
+    profiler may be active per process, and it sees all threads. One
+    shared Profile is then enabled on the first entry and disabled on the
+    last exit. Earlier versions profile only the thread that enables a
+    Profile, so there each thread gets its own, merged when dumped.
+    """
+
+    def __init__(self):
+        self.shared = sys.version_info >= (3, 12)
+        self.local = threading.local()
+        self.profiles = []
+        self.lock = threading.Lock()
+        self.active = 0                 # shared mode: entries not yet exited
+        self.enabled = False
+
+    def _new_profile(self):
+        import cProfile
+        profile = cProfile.Profile()
+        self.profiles.append(profile)
+        return profile
+
+    def enter(self):
+        if self.shared:
+            with self.lock:
+                if self.active == 0:
+                    profile = self.profiles[0] if self.profiles else self._new_profile()
+                    try:
+                        profile.enable()
+                        self.enabled = True
+                    except ValueError:  # another profiler is running: never break the caller
+                        self.enabled = False
+                self.active += 1
+            return
+        local = self.local
+        depth = getattr(local, 'depth', 0)
+        if depth == 0:
+            profile = getattr(local, 'profile', None)
+            if profile is None:
+                with self.lock:
+                    profile = local.profile = self._new_profile()
+            profile.enable()
+        local.depth = depth + 1
+
+    def exit(self):
+        if self.shared:
+            with self.lock:
+                self.active -= 1
+                if self.active == 0 and self.enabled:
+                    self.profiles[0].disable()
+                    self.enabled = False
+            return
+        local = self.local
+        local.depth -= 1
+        if local.depth == 0:
+            local.profile.disable()
+
+    def dump(self, path):
+        import pstats
+        with self.lock:
+            # A profile that never recorded a call cannot be loaded by pstats
+            profiles = [profile for profile in self.profiles if profile.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return path
+
+
+# --- Sampling profiling ---
+
+class StackSampler:
+    """Background thread that samples the stacks of registered threads.
+
+    Stacks are counted as collapsed strings "outer;inner;leaf", which is
+    what flamegraph tools expect.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self._active = {}               # thread id -> nesting depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enter(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+        if self._thread is None:
+            self.start()
+
+    def exit(self):
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._active[ident] - 1
+            if depth:
+                self._active[ident] = depth
+            else:
+                del self._active[ident]
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for ident in active:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.counts[_collapse(frame)] += 1
+
+    def collapsed(self):
+        """Collapsed-stack text: one "stack count" line per distinct stack."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def dump(self, path):
+        if not self.counts:
+            return None
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+        return path
+
+    def __enter__(self):
+        self.enter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.exit()
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        # Hide the profiling wrappers (not __file__: frozen modules may lack it)
+        if code.co_filename != _collapse.__code__.co_filename:
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+# --- Process-wide profilers, created on first use ---
+
+_cprofile = None
+_sampler = None
+_state_lock = threading.Lock()
+
+
+def _profiler(mode):
+    global _cprofile, _sampler
+    with _state_lock:
+        if mode == 'sample':
+            if _sampler is None:
+                _sampler = StackSampler()
+                atexit.register(dump)
+            return _sampler
+        if _cprofile is None:
+            _cprofile = _CProfileState()
+            atexit.register(dump)
+        return _cprofile
+
+
+def dump(directory=None):
+    """Write collected profiles; return the list of files written."""
+    directory = directory or os.environ.get(ENV_DIR, '.')
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"profile-{os.getpid()}")
+    written = []
+    if _cprofile is not None:
+        written.append(_cprofile.dump(base + '.pstats'))
+    if _sampler is not None:
+        _sampler.stop()
+        written.append(_sampler.dump(base + '.collapsed'))
+    return [path for path in written if path]
+
+
+def profiled(func=None, *, name=None):
+    """Profile func when its name is listed in MYPACKAGE_PROFILE.
+
+    When it is not listed, func itself is returned unchanged.
+    """
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    qualified = name or f"{func.__module__}.{func.__qualname__}"
+    if not is_enabled(qualified):
+        return func
+
+    profiler = _profiler(_mode())
+    enter, exit = profiler.enter, profiler.exit
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        enter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            exit()
+
+    return wrapper
+
+
+@contextmanager
+def profile_block(mode=None):
+    """Profile the body of a with-block, whatever MYPACKAGE_PROFILE says."""
+    profiler = _profiler(mode or _mode())
+    profiler.enter()
+    try:
+        yield profiler
+    finally:
+        profiler.exit()
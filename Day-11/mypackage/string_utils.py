@@ -2,10 +2,13 @@
 string_utils.py — String manipulation utilities
 """
 
+from .profiling import profiled
+
 def reverse_string(text):
     """Reverse a string."""
     return text[::-1]
 
+@profiled
 def capitalize_words(text):
     """Capitalize first letter of each word."""
     return ' '.join(word.capitalize() for word in text.split())
@@ -0,0 +1,201 @@
+"""
+ndjson.py — Newline-delimited JSON: batched appends, parallel reads
+
+utils.save_json() pretty-prints one whole document, so adding a single
+event means re-formatting and rewriting the entire file. NDJSON stores
+one compact JSON record per line instead: appending is cheap, and a
+file can be split on newlines and read by several processes at once.
+
+    with NDJSONWriter("events.ndjson", batch_size=5000) as out:
+        for event in events:
+            out.write(event)                  # buffered, flushed in batches
+
+    records = load_ndjson("events.ndjson", workers=4)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+__all__ = ['NDJSONWriter', 'save_ndjson', 'iter_ndjson', 'load_ndjson',
+           'process_ndjson', 'split_ranges']
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+class NDJSONWriter:
+    """Append records as NDJSON lines, writing them out in batches.
+
+    A batch is written when any flush policy is met:
+      batch_size      records buffered
+      flush_bytes     encoded bytes buffered
+      flush_interval  seconds since the last write-out (checked on write)
+    """
+
+    def __init__(self, path, mode='a', batch_size=1000, flush_bytes=1 << 20,
+                 flush_interval=None, fsync=False):
+        if mode not in ('a', 'w'):
+            raise ValueError("mode must be 'a' (append) or 'w' (truncate)")
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._file = open(path, mode + 'b')
+        self._lines = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self.records_written = 0
+
+    def write(self, record):
+        line = (_encode(record) + '\n').encode('utf-8')
+        self._lines.append(line)
+        self._pending_bytes += len(line)
+        if (len(self._lines) >= self.batch_size
+                or self._pending_bytes >= self.flush_bytes
+                or (self.flush_interval is not None
+                    and time.monotonic() - self._last_flush >= self.flush_interval)):
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Write buffered records with a single write() call."""
+        if self._lines:
+            self._file.write(b''.join(self._lines))
+            self.records_written += len(self._lines)
+            self._lines.clear()
+            self._pending_bytes = 0
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_ndjson(records, path, append=True, batch_size=1000):
+    """Write an iterable of records as NDJSON; return how many were written."""
+    with NDJSONWriter(path, 'a' if append else 'w', batch_size=batch_size) as writer:
+        writer.write_many(records)
+    return writer.records_written
+
+
+def iter_ndjson(path, start=0, end=None):
+    """Yield records whose lines START inside the byte range [start, end).
+
+    Ranges from split_ranges() therefore cover every line exactly once,
+    even though their boundaries fall in the middle of lines.
+    """
+    loads = json.loads
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Skip the line already in progress at start (it belongs to the
+            # previous range); if start is exactly a line start, this just
+            # consumes the preceding newline.
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        for line in f:
+            if end is not None and position >= end:
+                break
+            position += len(line)
+            if line.strip():
+                yield loads(line)
+
+
+def split_ranges(path, parts):
+    """Split a file into `parts` contiguous byte ranges [(start, end), ...]."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return [(0, 0)]
+    parts = max(1, min(parts, size))
+    step = -(-size // parts)
+    return [(i, min(i + step, size)) for i in range(0, size, step)]
+
+
+def _apply_range(func, path, start, end):
+    return func(iter_ndjson(path, start, end))
+
+
+def _worker_count(path, workers, min_bytes_per_worker):
+    workers = workers or os.cpu_count() or 1
+    return min(workers, os.path.getsize(path) // min_bytes_per_worker)
+
+
+def process_ndjson(path, func, workers=None, min_bytes_per_worker=4 << 20):
+    """Run func(records_iterator) on newline-aligned ranges in parallel.
+
+    Returns one result per range, in file order. func must be picklable
+    (a module-level function). Reducing inside func (counting, summing,
+    filtering) avoids shipping every record back to this process.
+    Small files (under min_bytes_per_worker per worker) are processed
+    here, since starting workers would cost more than it saves.
+    """
+    workers = _worker_count(path, workers, min_bytes_per_worker)
+    if workers <= 1:
+        return [func(iter_ndjson(path))]
+    ranges = split_ranges(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_apply_range, [func] * len(ranges), [path] * len(ranges), *zip(*ranges)))
+
+
+def load_ndjson(path, workers=None, min_bytes_per_worker=4 << 20):
+    """Load every record, parsing newline-aligned ranges in parallel."""
+    records = []
+    for chunk in process_ndjson(path, list, workers, min_bytes_per_worker):
+        records.extend(chunk)
+    return records
+
+
+def _count_clicks(records):
+    return sum(1 for record in records if record.get('type') == 'click')
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+
+    import utils
+
+    N = 300_000
+    events = [{'id': i, 'type': 'click', 'ts': 1_700_000_000 + i, 'tags': ['a', 'b']} for i in range(N)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'events.json')
+        ndjson_path = os.path.join(tmp, 'events.ndjson')
+
+        start = time.perf_counter()
+        utils.save_json(events, json_path)
+        print(f"save_json (indent=2) : {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        save_ndjson(events, ndjson_path, append=False, batch_size=10_000)
+        print(f"save_ndjson          : {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        save_ndjson(events[:100], ndjson_path)
+        print(f"append 100 records   : {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        for workers in (1, 4):
+            start = time.perf_counter()
+            records = load_ndjson(ndjson_path, workers=workers, min_bytes_per_worker=1)
+            print(f"load_ndjson x{workers}        : {time.perf_counter() - start:.2f}s ({len(records):,} records)")
+
+        # Reducing in the workers avoids pickling every record back
+        for workers in (1, 4):
+            start = time.perf_counter()
+            counts = process_ndjson(ndjson_path, _count_clicks, workers=workers, min_bytes_per_worker=1)
+            print(f"process_ndjson x{workers}     : {time.perf_counter() - start:.2f}s ({sum(counts):,} clicks)")
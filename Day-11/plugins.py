@@ -0,0 +1,204 @@
+"""
+plugins.py — Lazy plugin registry
+
+__all__ controls what a module exports, but offers no way to add extra
+implementations (another Calculator backend, another prime engine)
+without importing all of them. A PluginRegistry only records plugin
+NAMES and where to find them; the plugin itself is imported the first
+time it is requested:
+
+    engines = PluginRegistry('mypackage.prime_engines', directories=['plugins'])
+    engines.register('trial', 'mypackage.number_utils:is_prime')
+    engines.names()              # nothing imported yet
+    is_prime = engines.get('trial')
+
+Plugins come from three places:
+  * register(name, "module:attr")  — explicit, e.g. built-in defaults
+  * installed packages' entry points in the registry's group, e.g. in
+    pyproject.toml:  [project.entry-points."mypackage.prime_engines"]
+  * <name>.py files in the given directories; the plugin is the file's
+    `plugin` attribute, or the module itself if it has none
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+
+__all__ = ['PluginRegistry', 'PluginError', 'calculators', 'prime_engines']
+
+
+class PluginError(LookupError):
+    """A plugin is unknown or failed to load."""
+
+
+def _load_target(target):
+    """Import "package.module:attr.subattr" (attr part optional)."""
+    module_name, _, attrs = target.partition(':')
+    obj = importlib.import_module(module_name)
+    for attr in filter(None, attrs.split('.')):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _entry_points(group):
+    """(name, target) pairs for group from installed distributions.
+
+    Reads each *.dist-info/entry_points.txt on sys.path directly, which
+    is much cheaper at startup than importing importlib.metadata.
+    """
+    seen = set()
+    for location in sys.path:
+        try:
+            entries = list(os.scandir(location or '.'))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(('.dist-info', '.egg-info')):
+                continue
+            try:
+                with open(os.path.join(entry.path, 'entry_points.txt'), encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+            section = None
+            for line in lines:
+                line = line.strip()
+                if line.startswith('['):
+                    section = line.strip('[]').strip()
+                elif section == group and '=' in line and not line.startswith(('#', ';')):
+                    name, _, value = line.partition('=')
+                    name = name.strip()
+                    if name not in seen:
+                        seen.add(name)
+                        # Drop an optional "[extras]" suffix
+                        yield name, value.split('[')[0].strip()
+
+
+def _load_file(group, name, path):
+    module_name = f"_plugins.{group}.{name}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return getattr(module, 'plugin', module)
+
+
+class PluginRegistry:
+    """Name -> plugin mapping that imports each plugin on first use."""
+
+    def __init__(self, group, directories=()):
+        self.group = group
+        self.directories = [Path(d) for d in directories]
+        self._sources = {}      # name -> callable that loads the plugin
+        self._loaded = {}       # name -> plugin object
+        self._discovered = False
+        self._lock = threading.Lock()
+
+    def register(self, name, target):
+        """Register a plugin by "module:attr" string, or a ready object."""
+        if isinstance(target, str):
+            self._sources[name] = lambda: _load_target(target)
+        else:
+            self._sources[name] = lambda: target
+        self._loaded.pop(name, None)
+
+    def discover(self):
+        """Record plugin names from entry points and directories (no imports).
+
+        Explicitly registered plugins win over discovered ones.
+        """
+        with self._lock:
+            found = {}
+            for directory in self.directories:
+                for path in sorted(directory.glob('*.py')):
+                    if not path.name.startswith('_'):
+                        found[path.stem] = lambda p=path: _load_file(self.group, p.stem, p)
+            for name, target in _entry_points(self.group):
+                found.setdefault(name, lambda t=target: _load_target(t))
+            for name, source in found.items():
+                self._sources.setdefault(name, source)
+            self._discovered = True
+
+    def names(self):
+        """Names of all known plugins, without importing any of them."""
+        if not self._discovered:
+            self.discover()
+        return sorted(self._sources)
+
+    def get(self, name):
+        """Return the plugin, importing it on first request."""
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        if name not in self._sources and not self._discovered:
+            self.discover()
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            try:
+                source = self._sources[name]
+            except KeyError:
+                raise PluginError(f"No plugin {name!r} in group {self.group!r}") from None
+            try:
+                plugin = source()
+            except Exception as error:
+                raise PluginError(f"Plugin {name!r} in group {self.group!r} failed to load: {error}") from error
+            self._loaded[name] = plugin
+            return plugin
+
+    __getitem__ = get
+
+    def __contains__(self, name):
+        return name in self.names()
+
+    def loaded(self):
+        """Names of plugins that have been imported so far."""
+        return sorted(self._loaded)
+
+    def __repr__(self):
+        return f"PluginRegistry({self.group!r}, known={len(self._sources)}, loaded={len(self._loaded)})"
+
+
+# Built-in registries with the implementations that ship in this folder
+calculators = PluginRegistry('mypackage.calculators')
+calculators.register('default', 'math_utils:Calculator')
+calculators.register('simple', 'limited_module:Calculator')
+
+prime_engines = PluginRegistry('mypackage.prime_engines')
+prime_engines.register('trial', 'mypackage.number_utils:is_prime')
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(200):
+            Path(tmp, f"engine_{i:03}.py").write_text(
+                "import math\n"
+                "def plugin(n):\n"
+                "    return n > 1 and all(n % d for d in range(2, math.isqrt(n) + 1))\n")
+
+        start = time.perf_counter()
+        registry = PluginRegistry('mypackage.prime_engines', directories=[tmp])
+        names = registry.names()
+        elapsed = time.perf_counter() - start
+        print(f"Discovered {len(names)} plugins in {elapsed * 1000:.2f} ms, loaded: {registry.loaded()}")
+
+        start = time.perf_counter()
+        engine = registry.get('engine_042')
+        elapsed = time.perf_counter() - start
+        print(f"First use of engine_042: {elapsed * 1000:.2f} ms -> is 97 prime? {engine(97)}")
+        print(f"Loaded now: {registry.loaded()}")
+
+    print(f"\nBuilt-in calculators: {calculators.names()}")
+    print(f"calculators['default']().add(5) = {calculators['default']().add(5)}")
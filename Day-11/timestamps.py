@@ -0,0 +1,150 @@
+"""
+timestamps.py — Cheap ISO timestamps for high-rate logging
+
+utils.current_timestamp() builds a datetime and formats all of it on
+every call. Within one second only the microseconds change, so a
+TimestampSource formats "YYYY-MM-DDTHH:MM:SS" once per second and
+appends the fraction:
+
+    from timestamps import current_timestamp     # same output as utils'
+    current_timestamp()                           # '2024-01-15T09:30:00.123456'
+
+Wall-clock time can jump (NTP steps, manual changes), which reorders
+log lines. stamp() derives wall time from the monotonic clock instead,
+re-anchored once per resync interval, and returns both readings:
+
+    source = TimestampSource()
+    stamp = source.stamp()            # Stamp(monotonic_ns, wall_ns, iso)
+
+    source.stamp_many(events)         # sets event['timestamp'] on every dict
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+__all__ = ['TimestampSource', 'Stamp', 'current_timestamp']
+
+Stamp = namedtuple('Stamp', 'monotonic_ns wall_ns iso')
+# Skips namedtuple's Python-level __new__, a third of stamp()'s cost
+_new_stamp = tuple.__new__
+
+# "000".."999": two lookups format the six fraction digits faster than
+# an f-string format spec does
+_DIGITS = [f"{i:03d}" for i in range(1000)]
+
+
+class TimestampSource:
+    """ISO-8601 timestamps with the date/time-of-second part cached.
+
+    utc=False gives local time without an offset, like
+    datetime.now().isoformat(); utc=True appends "+00:00", like
+    datetime.now(timezone.utc).isoformat().
+    """
+
+    def __init__(self, utc=False, resync_interval=1.0):
+        self.utc = utc
+        self.resync_ns = int(resync_interval * 1e9)
+        self._to_struct = time.gmtime if utc else time.localtime
+        self._suffix = suffix = '+00:00' if utc else ''
+        self._last_digits = [digits + suffix for digits in _DIGITS]
+        # (second, "YYYY-MM-DDTHH:MM:SS.") replaced as one object, so
+        # threads never see a second paired with another second's text
+        self._second = (None, '')
+        self._anchor = self._new_anchor()
+        self._last_wall_ns = 0
+        self._lock = threading.Lock()
+
+    def format_ns(self, wall_ns):
+        """Format a time.time_ns()-style value."""
+        micros = wall_ns // 1000
+        second = micros // 1_000_000
+        micros -= second * 1_000_000
+        cached_second, prefix = self._second
+        if second != cached_second:
+            prefix = time.strftime('%Y-%m-%dT%H:%M:%S.', self._to_struct(second))
+            self._second = (second, prefix)
+        if micros:
+            return prefix + _DIGITS[micros // 1000] + self._last_digits[micros % 1000]
+        # isoformat() leaves out a zero fraction; match it exactly
+        return prefix[:-1] + self._suffix
+
+    def now(self):
+        """Current wall-clock time as an ISO string."""
+        return self.format_ns(time.time_ns())
+
+    def stamp(self):
+        """Stamp(monotonic_ns, wall_ns, iso) with wall time taken from the monotonic clock.
+
+        Wall times from one source never go backwards, even when the
+        system clock is stepped back; a step forward is picked up at the
+        next resync.
+        """
+        monotonic_ns = time.monotonic_ns()
+        anchor_monotonic, anchor_wall = self._anchor
+        if monotonic_ns - anchor_monotonic >= self.resync_ns:
+            with self._lock:
+                if self._anchor[0] == anchor_monotonic:
+                    self._anchor = self._new_anchor()
+                anchor_monotonic, anchor_wall = self._anchor
+        wall_ns = anchor_wall + (monotonic_ns - anchor_monotonic)
+        if wall_ns < self._last_wall_ns:
+            wall_ns = self._last_wall_ns
+        self._last_wall_ns = wall_ns
+        return _new_stamp(Stamp, (monotonic_ns, wall_ns, self.format_ns(wall_ns)))
+
+    def stamp_many(self, events, key='timestamp', monotonic_key=None):
+        """Stamp a batch of event dicts with one clock reading; return events.
+
+        Every event gets the same ISO string (formatted once). With
+        monotonic_key, the monotonic reading is stored too, e.g. for
+        computing durations between batches.
+        """
+        stamp = self.stamp()
+        iso = stamp.iso
+        for event in events:
+            event[key] = iso
+        if monotonic_key is not None:
+            monotonic_ns = stamp.monotonic_ns
+            for event in events:
+                event[monotonic_key] = monotonic_ns
+        return events
+
+    @staticmethod
+    def _new_anchor():
+        return time.monotonic_ns(), time.time_ns()
+
+
+_default = TimestampSource()
+
+
+def current_timestamp():
+    """Get current ISO timestamp (drop-in for utils.current_timestamp)."""
+    return _default.format_ns(time.time_ns())
+
+
+# This runs only when module is executed directly
+if __name__ == "__main__":
+    import timeit
+    from datetime import datetime
+
+    import utils
+
+    # Same text as datetime.isoformat(), including across second boundaries
+    for wall_ns in (1_700_000_000_000_000_000, 1_700_000_000_000_001_000, 1_700_000_000_999_999_000):
+        expected = datetime.fromtimestamp(wall_ns // 1000 / 1e6).isoformat()
+        assert _default.format_ns(wall_ns) == expected, (wall_ns, expected)
+
+    n = 1_000_000
+    for label, func in [("utils.current_timestamp", utils.current_timestamp),
+                        ("current_timestamp", current_timestamp),
+                        ("TimestampSource.stamp", _default.stamp)]:
+        per_call = timeit.timeit(func, number=n) / n * 1e9
+        print(f"{label:<24} {per_call:6.0f} ns per call")
+
+    events = [{'event': 'login', 'user': f'user{i}'} for i in range(100_000)]
+    start = time.perf_counter()
+    _default.stamp_many(events, monotonic_key='monotonic_ns')
+    per_event = (time.perf_counter() - start) / len(events) * 1e9
+    print(f"{'stamp_many':<24} {per_event:6.0f} ns per event")
+    print(f"Sample: {events[0]}")
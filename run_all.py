@@ -0,0 +1,175 @@
+"""
+run_all.py — Run every Day-XX script in parallel and time it
+
+Each lesson script runs in a fresh copy of its Day folder inside a
+temporary directory, so scripts that create and delete files (Day-10,
+Day-11) cannot interfere with each other or with the repository.
+
+For every script the report records exit code, stdout, wall time, peak
+RSS and total import time (from python -X importtime):
+
+    python run_all.py                          # writes run_report.json
+    python run_all.py --workers 4 -o new.json
+    python run_all.py --compare run_report.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# The lesson script in each Day folder
+SCRIPT_NAMES = ('helloworld.py', 'script.py', 'main.py')
+
+
+def find_scripts(root=ROOT):
+    """Lesson scripts, e.g. Day-01/helloworld.py, in day order."""
+    scripts = []
+    for day in sorted(root.glob('Day-*')):
+        for name in SCRIPT_NAMES:
+            if (day / name).is_file():
+                scripts.append(day / name)
+    return scripts
+
+
+def _import_seconds(stderr):
+    """Sum of cumulative times of top-level imports in -X importtime output."""
+    total_us = 0
+    other = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            other.append(line)
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue            # header line
+        # Nested imports are indented by two extra spaces per level
+        if not fields[2].startswith('  '):
+            total_us += int(fields[1])
+    return total_us / 1e6, '\n'.join(other)
+
+
+def run_script(script, root=ROOT, timeout=300):
+    """Run one script in an isolated copy of its folder; return a result dict."""
+    with tempfile.TemporaryDirectory(prefix='run_all-') as tmp:
+        workdir = Path(tmp) / script.parent.name
+        shutil.copytree(script.parent, workdir,
+                        ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        stdout_path = Path(tmp) / 'stdout.txt'
+        stderr_path = Path(tmp) / 'stderr.txt'
+        env = dict(os.environ, PYTHONIOENCODING='utf-8', PYTHONDONTWRITEBYTECODE='1')
+
+        with open(stdout_path, 'wb') as out, open(stderr_path, 'wb') as err:
+            start = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, '-X', 'importtime', script.name],
+                                    cwd=workdir, stdin=subprocess.DEVNULL,
+                                    stdout=out, stderr=err, env=env)
+            try:
+                # wait4 gives the resource usage of exactly this child
+                _, status, usage = _wait4(proc, timeout)
+                returncode = os.waitstatus_to_exitcode(status)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                _, _, usage = os.wait4(proc.pid, 0)
+                returncode = None
+            wall = time.perf_counter() - start
+            proc.returncode = returncode    # already reaped; stop Popen waiting again
+
+        import_seconds, stderr = _import_seconds(stderr_path.read_text('utf-8', 'replace'))
+        return {
+            'script': script.relative_to(root).as_posix(),
+            'returncode': returncode,
+            'wall_seconds': round(wall, 4),
+            'peak_rss_kb': usage.ru_maxrss,     # kilobytes on Linux
+            'import_seconds': round(import_seconds, 4),
+            'stdout': stdout_path.read_text('utf-8', 'replace'),
+            'stderr': stderr,
+        }
+
+
+def _wait4(proc, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            return pid, status, usage
+        if time.monotonic() > deadline:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        time.sleep(0.005)
+
+
+def run_all(scripts, workers):
+    # Each script is its own process; the pool only limits how many run at once
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_script, scripts))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scripts': {result['script']: result for result in results},
+    }
+
+
+def compare(old, new, tolerance=0.2, min_delta=0.05):
+    """Print per-script changes; return names that regressed in wall time."""
+    regressions = []
+    print(f"{'script':<22} {'wall old':>9} {'wall new':>9} {'change':>8} "
+          f"{'rss new (MB)':>13} {'import new':>11}")
+    for name, result in new['scripts'].items():
+        before = old['scripts'].get(name)
+        if before is None:
+            print(f"{name:<22} {'-':>9} {result['wall_seconds']:>9.3f} {'-':>8} "
+                  f"{result['peak_rss_kb'] / 1024:>13.1f} {result['import_seconds']:>11.3f}")
+            continue
+        old_wall, new_wall = before['wall_seconds'], result['wall_seconds']
+        change = (new_wall - old_wall) / old_wall if old_wall else 0.0
+        flag = ''
+        if change > tolerance and new_wall - old_wall > min_delta:
+            flag = '  <-- slower'
+            regressions.append(name)
+        if before['returncode'] == 0 and result['returncode'] != 0:
+            flag += '  <-- now failing'
+            regressions.append(name)
+        print(f"{name:<22} {old_wall:>9.3f} {new_wall:>9.3f} {change:>+8.0%} "
+              f"{result['peak_rss_kb'] / 1024:>13.1f} {result['import_seconds']:>11.3f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run all Day-XX scripts in parallel.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), metavar='N')
+    parser.add_argument('-o', '--output', default='run_report.json', help="JSON report path")
+    parser.add_argument('--compare', metavar='OLD_REPORT', help="compare against an earlier report")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative wall-time increase (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    # Read the old report first: --compare and --output may be the same file
+    old = json.loads(Path(args.compare).read_text()) if args.compare else None
+    report = run_all(find_scripts(), args.workers)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+
+    failed = [name for name, result in report['scripts'].items() if result['returncode'] != 0]
+    print(f"Ran {len(report['scripts'])} scripts, {len(failed)} failed -> {args.output}")
+    for name in failed:
+        print(f"  FAILED: {name}\n{report['scripts'][name]['stderr']}")
+
+    if old is not None:
+        if compare(old, report, tolerance=args.tolerance):
+            return 1
+    else:
+        compare({'scripts': {}}, report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())